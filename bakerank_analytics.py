@@ -0,0 +1,220 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+# Check for required packages BEFORE importing them
+try:
+    import numpy as np
+except ImportError:
+    print("=" * 50)
+    print("❌ MISSING PACKAGE: numpy")
+    print("=" * 50)
+    print("Analytics needs NumPy: pip install numpy")
+    print("=" * 50)
+    sys.exit(1)
+
+import bakerank_db
+from bakerank_config import CONFIG_FILE, build_game_config, load_game_config
+from bakerank_stats import STATS_PATH
+
+# ============ OFFLINE ANALYTICS ============
+# Loads the player database into NumPy columns and answers questions about
+# the whole channel with vectorized operations - fast enough for millions
+# of players. Usage: py bakerank_analytics.py [--csv out.csv] [--npz out.npz]
+
+DB_PATH = "bakerank_data.txt"
+PERCENTILES = [50, 75, 90, 99, 99.9]
+ACTIVITY_BINS = [(1, "last 24h"), (7, "last 7 days"), (30, "last 30 days"),
+                 (90, "last 90 days"), (365, "last year")]
+
+
+class PlayerTable:
+    """Column-oriented player database: names plus NumPy score/time arrays"""
+
+    def __init__(self, names, scores, last_bake_times):
+        self.names = names
+        self.scores = scores
+        self.last_bake_times = last_bake_times
+
+    def __len__(self):
+        return len(self.names)
+
+
+def load_player_table(path=DB_PATH):
+    """Parse bakerank_data.txt (same parser as the bot) into columns"""
+    names = []
+    scores = []
+    times = []
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for username, bake_score, last_bake_time in bakerank_db.iter_player_records(f):
+                names.append(username)
+                scores.append(bake_score)
+                times.append(last_bake_time)
+    return PlayerTable(names, np.array(scores, dtype=np.int64), np.array(times, dtype=np.float64))
+
+
+def load_stats_columns(path, names):
+    """Per-player (bakes, legendary_hits) arrays aligned with `names`, or None"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        players = json.load(f).get('players', {})
+    bakes = np.zeros(len(names), dtype=np.int64)
+    legendaries = np.zeros(len(names), dtype=np.int64)
+    for i, name in enumerate(names):
+        row = players.get(name)
+        if row:
+            legendaries[i] = row[1]
+            bakes[i] = sum(row[5])
+    return bakes, legendaries
+
+
+# ------------- VECTORIZED QUERIES -----------------
+def rank_distribution(scores, config):
+    """Players per rank, using the configured thresholds"""
+    thresholds = np.array(config.rank_thresholds, dtype=np.int64)
+    idx = np.searchsorted(thresholds, scores, side='right') - 1
+    counts = np.bincount(np.clip(idx, 0, None), minlength=len(thresholds))
+    return list(zip(config.rank_titles, counts.tolist()))
+
+
+def score_percentiles(scores):
+    if not len(scores):
+        return []
+    return list(zip(PERCENTILES, np.percentile(scores, PERCENTILES).tolist()))
+
+
+def activity_histogram(last_bake_times, now):
+    """Players whose last bake falls in each 'within N days' bucket"""
+    baked = last_bake_times[last_bake_times > 0]
+    days_ago = (now - baked) / 86400.0
+    edges = np.array([days for days, _ in ACTIVITY_BINS], dtype=np.float64)
+    within = np.searchsorted(edges, days_ago, side='left')
+    counts = np.bincount(within, minlength=len(edges) + 1)
+    # Cumulative: 'last 7 days' includes 'last 24h'
+    cumulative = np.cumsum(counts)[:len(edges)]
+    return [(label, int(n)) for (_, label), n in zip(ACTIVITY_BINS, cumulative)], int(len(last_bake_times) - len(baked))
+
+
+def hour_histogram(last_bake_times):
+    """Last bakes per local hour of day (when is chat baking?)"""
+    baked = last_bake_times[last_bake_times > 0]
+    offset = time.localtime().tm_gmtoff
+    hours = ((baked + offset) // 3600 % 24).astype(np.int64)
+    return np.bincount(hours, minlength=24)
+
+
+def legendary_rates(bakes, legendaries):
+    """(channel rate, per-player rates for players with bakes)"""
+    total = bakes.sum()
+    channel = legendaries.sum() / total if total else 0.0
+    active = bakes > 0
+    return channel, legendaries[active] / bakes[active]
+
+
+# ------------- EXPORT -----------------
+def export_csv(table, path):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["username", "bake_score", "last_bake_time"])
+        writer.writerows(zip(table.names, table.scores.tolist(), table.last_bake_times.tolist()))
+
+
+def export_npz(table, path):
+    """Columnar binary export: names as one UTF-8 blob plus offsets"""
+    encoded = [name.encode('utf-8') for name in table.names]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    np.savez_compressed(
+        path,
+        names_blob=np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        names_offsets=offsets,
+        bake_score=table.scores,
+        last_bake_time=table.last_bake_times
+    )
+
+
+def load_npz(path):
+    """Read a PlayerTable back from export_npz output"""
+    with np.load(path) as data:
+        blob = data['names_blob'].tobytes()
+        offsets = data['names_offsets']
+        names = [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+        return PlayerTable(names, data['bake_score'], data['last_bake_time'])
+
+
+# ------------- REPORT -----------------
+def print_report(table, config, stats_columns, now):
+    print("=" * 50)
+    print(f"🍞 BakeRank Analytics - {len(table)} players")
+    print("=" * 50)
+    if not len(table):
+        print("No bakers yet.")
+        return
+
+    print(f"\n🏆 Total score: {int(table.scores.sum())} | Mean: {table.scores.mean():.1f} | Max: {int(table.scores.max())}")
+    print("\n📊 Rank distribution:")
+    for title, n in rank_distribution(table.scores, config):
+        print(f"  {title:<24} {n:>10}  ({n / len(table):6.2%})")
+
+    print("\n📈 Score percentiles:")
+    for p, value in score_percentiles(table.scores):
+        print(f"  p{p:<6} {value:>10.1f}")
+
+    buckets, never = activity_histogram(table.last_bake_times, now)
+    print("\n⏱️ Active players:")
+    for label, n in buckets:
+        print(f"  {label:<14} {n:>10}")
+    if never:
+        print(f"  {'never baked':<14} {never:>10}")
+
+    hours = hour_histogram(table.last_bake_times)
+    peak = int(hours.argmax())
+    print(f"\n🕒 Busiest hour for last bakes: {peak:02d}:00 ({int(hours[peak])} players)")
+
+    if stats_columns is not None:
+        bakes, legendaries = stats_columns
+        channel, per_player = legendary_rates(bakes, legendaries)
+        print(f"\n✨ Legendary rate: {channel:.3%} observed vs {config.legendary_rate:.3%} configured")
+        if len(per_player):
+            lucky = int((per_player > config.legendary_rate).sum())
+            print(f"  Players above the configured rate: {lucky} of {len(per_player)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BakeRank player database analytics")
+    parser.add_argument("--db", default=DB_PATH, help="player database (bakerank_data.txt)")
+    parser.add_argument("--stats", default=STATS_PATH, help="bake statistics (bakerank_stats.json)")
+    parser.add_argument("--config", default=CONFIG_FILE, help="game settings (bakerank_config.json)")
+    parser.add_argument("--csv", help="export players to this CSV file")
+    parser.add_argument("--npz", help="export players to this compressed columnar .npz file")
+    args = parser.parse_args()
+
+    try:
+        config = load_game_config(args.config)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Warning: Could not load game settings, using defaults: {e}")
+        config = build_game_config({})
+
+    start = time.perf_counter()
+    table = load_player_table(args.db)
+    stats_columns = load_stats_columns(args.stats, table.names)
+    loaded = time.perf_counter() - start
+
+    print_report(table, config, stats_columns, time.time())
+    print(f"\n⚡ Loaded in {loaded:.2f}s")
+
+    if args.csv:
+        export_csv(table, args.csv)
+        print(f"💾 Exported CSV: {args.csv}")
+    if args.npz:
+        export_npz(table, args.npz)
+        print(f"💾 Exported NPZ: {args.npz}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+import argparse
+import asyncio
+import contextlib
+import importlib.util
+import io
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# ============ REGRESSION BENCHMARKS ============
+# Times every hot path of the bot headless: no Twitch credentials, no
+# network besides loopback, no PyQt5. Needs twitchio + websockets installed.
+#
+#   py bakerank_bench.py --save-baseline     record bench_baseline.json
+#   py bakerank_bench.py                     compare, exit 1 on regression
+#   py bakerank_bench.py --compare-runtime   event loop / overlay server options
+#   py bakerank_bench.py --crash-test        data lost per durability mode on a crash
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(REPO_DIR, "bench_baseline.json")
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_CLIENTS = [1, 10, 100]
+DEFAULT_TOLERANCE = 0.25  # fail when a metric gets 25% slower than baseline
+REPEATS = 5
+RAID_BAKES = 200          # concurrent bakes per durability throughput run
+BATCH_BAKES = 10000       # events per engine.bake_many() batch
+CRASH_RUNS = 3            # kills per durability mode in --crash-test
+CRASH_BAKE_RATE = 500     # bakes per second the crash test child sustains
+
+
+def measure(fn, number, repeats=REPEATS):
+    """Best per-call time over `repeats` runs of `number` calls"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+async def measure_async(fn, number, repeats=REPEATS, cpu=None):
+    """Best per-call wall time; per-call CPU time is stored in cpu['time']"""
+    best = float('inf')
+    cpu_start = time.process_time()
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            await fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    if cpu is not None:
+        cpu['time'] = (time.process_time() - cpu_start) / (number * repeats)
+    return best
+
+
+def make_players(size, now):
+    rng = random.Random(size)
+    return {
+        f"baker{i}": {'bake_score': int(rng.paretovariate(1.2)), 'last_bake_time': now - rng.random() * 86400 * 30}
+        for i in range(size)
+    }
+
+
+class FakeAuthor:
+    def __init__(self, name):
+        self.name = name
+
+
+class FakeContext:
+    """Just enough of a twitchio Context for the command callbacks"""
+
+    def __init__(self, name):
+        self.author = FakeAuthor(name)
+        self.sent = []
+
+    async def send(self, content):
+        self.sent.append(content)
+
+
+# ------------- BENCHMARKS -----------------
+def bench_pure(bot_module, results):
+    rng = random.Random(1)
+    scores = [rng.randint(0, 20000) for _ in range(1000)]
+    it = iter(range(10 ** 9))
+    results['get_rank_title'] = measure(lambda: bot_module.get_rank_title(scores[next(it) % 1000]), 20000)
+    results['choose_baked_good'] = measure(bot_module.choose_baked_good, 20000)
+    results['format_item_name'] = measure(lambda: bot_module.format_item_name("Legendary-glazed-donut.png"), 20000)
+
+
+def bench_database(bot_module, sizes, results, now):
+    import bakerank_db
+
+    for size in sizes:
+        players = make_players(size, now)
+        path = bot_module.DB_PATH
+        bakerank_db.save_player_data(players, path)
+        number = max(1, 20000 // size)
+        results[f'save_player_data[{size}]'] = measure(lambda: bakerank_db.save_player_data(players, path), number)
+        results[f'load_player_data[{size}]'] = measure(lambda: bakerank_db.load_player_data(path), number)
+
+
+async def bench_bot(bot_module, sizes, results, now):
+    from bakerank_admission import AdmissionController
+    from bakerank_engine import BakeEngine
+
+    bot = bot_module.BakeRankBot()
+    # Benchmark traffic must never be throttled by admission control
+    bot.admission = AdmissionController(bot_module.engine.config.cooldown, rate=1e12, burst=1e12)
+    bake = type(bot).bake._callback
+    # Fresh usernames every call so no bake ever hits the cooldown
+    counter = iter(range(10 ** 9))
+
+    for size in sizes:
+        engine = BakeEngine(bot_module.engine.config, make_players(size, now))
+        engine.persist_with(bot_module.runtime_settings, bot_module.DB_PATH)
+        engine.broadcast = bot_module.broadcast_to_overlays
+        bot_module.engine = engine
+        for window in ('all', 'week'):
+            results[f'fetch_leaderboard[{window},{size}]'] = measure(
+                lambda: engine.leaderboard(window, 5), 2000)
+
+        async def one_bake():
+            await bake(bot, FakeContext(f"newbaker{next(counter)}"))
+
+        number = max(3, 2000 // size)
+        with contextlib.redirect_stdout(io.StringIO()):
+            results[f'bake[{size}]'] = await measure_async(one_bake, number)
+            await bench_durability(bot_module, one_bake, size, results)
+
+        # The only part of a flush that runs on the event loop
+        def capture_one():
+            engine.bake(f"newbaker{next(counter)}", now)
+            engine.snapshot()
+
+        results[f'snapshot_capture[{size}]'] = measure(capture_one, 20)
+
+        # Batched path (replays / bulk imports): per event, one publish per batch
+        events = [(f"replayer{next(counter)}", now) for _ in range(BATCH_BAKES)]
+        start = time.perf_counter()
+        await engine.publish(engine.bake_many(events))
+        await engine.persistence.flush()
+        results[f'bake_many[{size}]'] = (time.perf_counter() - start) / BATCH_BAKES
+
+
+async def bench_durability(bot_module, one_bake, size, results):
+    """Throughput of a raid of concurrent bakes under each durability mode"""
+    from bakerank_db import DURABILITY_MODES, SnapshotWriter
+
+    engine = bot_module.engine
+    original = engine.persistence
+    try:
+        for mode in DURABILITY_MODES:
+            engine.persistence = SnapshotWriter(original.snapshot, mode)
+            start = time.perf_counter()
+            await asyncio.gather(*[one_bake() for _ in range(RAID_BAKES)])
+            await engine.persistence.flush()
+            results[f'bake_throughput[{mode},{size}]'] = (time.perf_counter() - start) / RAID_BAKES
+    finally:
+        engine.persistence = original
+
+
+async def bench_broadcast(bot_module, client_counts, results, server_options, cpu_results=None):
+    import websockets
+    import bakerank_overlay
+
+    message = {"event": "bake", "user": "bench", "rank": "Dough Master", "score": 300,
+               "item": "donut.png", "is_legendary": False, "trigger_explosion": False, "ranked_up": False}
+    async with websockets.serve(bakerank_overlay.handle_overlay_connection, "127.0.0.1", 0, **server_options) as server:
+        port = server.sockets[0].getsockname()[1]
+        for n in client_counts:
+            received = {'count': 0, 'target': 0}
+            done = asyncio.Event()
+
+            async def reader(ws):
+                async for _ in ws:
+                    received['count'] += 1
+                    if received['count'] >= received['target']:
+                        done.set()
+
+            clients = [await websockets.connect(f"ws://127.0.0.1:{port}") for _ in range(n)]
+            readers = [asyncio.create_task(reader(ws)) for ws in clients]
+            while len(bakerank_overlay.overlay_clients) < n:
+                await asyncio.sleep(0.01)
+
+            async def one_broadcast():
+                # Time until every overlay has the frame, not just until it is queued
+                done.clear()
+                received['count'] = 0
+                received['target'] = n
+                await bot_module.broadcast_to_overlays(message)
+                await done.wait()
+
+            metric = f'broadcast_to_overlays[{n} clients]'
+            cpu = {}
+            results[metric] = await measure_async(one_broadcast, 200, cpu=cpu)
+            if cpu_results is not None:
+                cpu_results[metric] = cpu['time']
+
+            for ws in clients:
+                await ws.close()
+            await asyncio.gather(*readers, return_exceptions=True)
+            while bakerank_overlay.overlay_clients:
+                await asyncio.sleep(0.01)
+
+
+@contextlib.contextmanager
+def scratch_bot():
+    """Import the bot inside a scratch directory so the real database,
+    stats and leaderboard files are never read or overwritten"""
+    workdir = tempfile.mkdtemp(prefix="bakerank_bench_")
+    old_cwd = os.getcwd()
+    try:
+        os.chdir(workdir)
+        shutil.copytree(os.path.join(REPO_DIR, "overlay"), os.path.join(workdir, "overlay"))
+        sys.path.insert(0, REPO_DIR)
+        import bakerank_bot
+        yield bakerank_bot
+    finally:
+        os.chdir(old_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run_benchmarks(sizes, client_counts, event_loop):
+    from bakerank_runtime import RUNTIME_DEFAULTS, overlay_server_options, run
+
+    with scratch_bot() as bakerank_bot:
+        now = time.time()
+        results = {}
+        bench_pure(bakerank_bot, results)
+        bench_database(bakerank_bot, sizes, results, now)
+
+        async def run_async():
+            await bench_bot(bakerank_bot, sizes, results, now)
+            await bench_broadcast(bakerank_bot, client_counts, results, overlay_server_options(RUNTIME_DEFAULTS))
+
+        run(run_async, event_loop)
+        return results
+
+
+def compare_runtime_options(client_counts):
+    """Overlay fan-out latency and CPU for each event loop x server settings"""
+    from bakerank_runtime import FAST_LOOPS, RUNTIME_DEFAULTS, overlay_server_options, run
+
+    loops = ["asyncio"] + [name for name in FAST_LOOPS if importlib.util.find_spec(name)]
+    server_variants = {
+        "websockets defaults": {},
+        "tuned": overlay_server_options(RUNTIME_DEFAULTS)
+    }
+    with scratch_bot() as bakerank_bot:
+        print("=" * 78)
+        print("🍞 Overlay fan-out: wall time / CPU time per broadcast (clients run in-process)")
+        print("=" * 78)
+        for loop_name in loops:
+            for variant, options in server_variants.items():
+                results = {}
+                cpu_results = {}
+                run(lambda: bench_broadcast(bakerank_bot, client_counts, results, options, cpu_results), loop_name)
+                for metric, wall in results.items():
+                    print(f"  {loop_name:<8} {variant:<20} {metric:<34} "
+                          f"{format_time(wall)}  cpu {format_time(cpu_results[metric])}")
+
+
+# ------------- CRASH INJECTION -----------------
+def crash_child(workdir, mode, acked, rate):
+    """Bake forever at `rate` per second; `acked` counts bakes commit() confirmed"""
+    os.chdir(workdir)
+    sys.path.insert(0, REPO_DIR)
+    import bakerank_db
+
+    players = {}
+
+    def snapshot():
+        text = bakerank_db.format_player_data(players)
+        return lambda: [("bakerank_data.txt", text)]
+
+    writer = bakerank_db.SnapshotWriter(snapshot, mode)
+
+    async def main():
+        asyncio.ensure_future(writer.run())
+        i = 0
+        while True:
+            data = players.setdefault(f"baker{i % 5000}", {'bake_score': 0, 'last_bake_time': 0})
+            data['bake_score'] += 1
+            data['last_bake_time'] = time.time()
+            await writer.commit()
+            i += 1
+            acked.value = i
+            await asyncio.sleep(1 / rate)
+
+    asyncio.run(main())
+
+
+def crash_test(runs, rate):
+    """Kill a baking process at random moments and count acknowledged bakes
+    missing from disk. A killed process keeps what reached the OS, so this
+    shows the write-scheduling loss; fsync additionally covers power loss."""
+    from bakerank_db import DURABILITY_MODES, iter_player_records
+
+    print("=" * 70)
+    print(f"💥 Crash injection: {runs} kills per mode at ~{rate} bakes/s")
+    print("=" * 70)
+    rng = random.Random()
+    for mode in DURABILITY_MODES:
+        losses = []
+        unreadable = 0
+        for _ in range(runs):
+            workdir = tempfile.mkdtemp(prefix="bakerank_crash_")
+            try:
+                acked = multiprocessing.Value('q', 0)
+                child = multiprocessing.Process(target=crash_child, args=(workdir, mode, acked, rate))
+                child.start()
+                time.sleep(rng.uniform(1.0, 7.0))
+                child.kill()
+                child.join()
+                persisted = 0
+                path = os.path.join(workdir, "bakerank_data.txt")
+                if os.path.exists(path):
+                    try:
+                        with open(path, 'r', encoding='utf-8') as f:
+                            persisted = sum(score for _, score, _ in iter_player_records(f))
+                    except ValueError:
+                        unreadable += 1
+                losses.append(max(0, acked.value - persisted))
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+        print(f"  {mode:<14} max loss {max(losses):>6} bakes   mean {statistics.mean(losses):>8.1f}"
+              f"   unreadable files {unreadable}")
+
+
+# ------------- BASELINES -----------------
+def compare(results, baseline, tolerance):
+    """Return [(metric, baseline, current, ratio)] for regressed metrics"""
+    regressions = []
+    for metric, current in results.items():
+        before = baseline.get(metric)
+        if before and current > before * (1 + tolerance):
+            regressions.append((metric, before, current, current / before))
+    return regressions
+
+
+def format_time(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:9.2f} µs"
+    return f"{seconds * 1e3:9.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BakeRank hot path benchmarks")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="player database sizes, comma separated")
+    parser.add_argument("--clients", default=",".join(map(str, DEFAULT_CLIENTS)),
+                        help="overlay websocket client counts, comma separated")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--event-loop", default="asyncio",
+                        help="event loop backend to benchmark on (asyncio, uvloop, winloop, auto)")
+    parser.add_argument("--compare-runtime", action="store_true",
+                        help="compare overlay latency/CPU across event loops and server settings")
+    parser.add_argument("--crash-test", action="store_true",
+                        help="kill a baking process and report data lost per durability mode")
+    parser.add_argument("--crash-runs", type=int, default=CRASH_RUNS, help="kills per durability mode")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    client_counts = [int(c) for c in args.clients.split(",") if c]
+
+    if args.compare_runtime:
+        compare_runtime_options(client_counts)
+        return 0
+    if args.crash_test:
+        crash_test(args.crash_runs, CRASH_BAKE_RATE)
+        return 0
+
+    results = run_benchmarks(sizes, client_counts, args.event_loop)
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f).get('results', {})
+
+    print("=" * 70)
+    print("🍞 BakeRank Benchmarks (best time per call)")
+    print("=" * 70)
+    for metric, value in results.items():
+        line = f"  {metric:<40} {format_time(value)}"
+        if metric.startswith("bake_throughput"):
+            line += f"  {1 / value:>9,.0f} bakes/s"
+        if metric in baseline:
+            line += f"   ({value / baseline[metric]:5.2f}x baseline)"
+        print(line)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({'created': time.time(), 'python': sys.version.split()[0],
+                       'event_loop': args.event_loop, 'results': results}, f, indent=2)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+        return 0
+
+    if not baseline:
+        print("\nℹ️ No baseline yet - run with --save-baseline to record one.")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} metric(s) regressed more than {args.tolerance:.0%}:")
+        for metric, before, current, ratio in regressions:
+            print(f"  {metric}: {format_time(before).strip()} -> {format_time(current).strip()} ({ratio:.2f}x)")
+        return 1
+    print(f"\n✅ No regressions beyond {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,5 @@
 import asyncio
-import time
-import json
-import random
 import os
-import glob
 import socket
 import sys
 
@@ -32,251 +28,126 @@ except ImportError:
     input("\nPress Enter to exit...")
     sys.exit(1)
 
+from bakerank_admission import AdmissionController
+from bakerank_chat import bake_command, format_item_name, legendaries_command, mystats_command, topbakers_command
+from bakerank_config import CONFIG_FILE, ConfigWatcher
+from bakerank_engine import setup_engine
+from bakerank_runtime import load_runtime_settings, run as run_event_loop
+from bakerank_overlay import (OverlayProcess, OverlayPublisher, broadcast_to_overlays,
+                              serve_overlays, use_overlay_publisher)
+
 
 TOKEN = "XXXXXXXXX"
 CLIENT_ID = "XXXXXXXXX"
 CHANNEL = "XXXXXXXXX"
-COOLDOWN = 60
 
 DB_PATH = "bakerank_data.txt"
-OVERLAY_FOLDER = "overlay"
 
-# ============ WEBSOCKET SERVER (BUILT-IN) ============
-overlay_clients = set()
+# Event loop backend + overlay server tuning (read once at startup)
+runtime_settings = load_runtime_settings(CONFIG_FILE)
 
-async def handle_overlay_connection(websocket):
-    """Handle incoming overlay connections"""
-    overlay_clients.add(websocket)
-    # Silently handle overlay connections
-    try:
-        async for _ in websocket:
-            pass
-    finally:
-        overlay_clients.remove(websocket)
+# ============ GAME ENGINE ============
+# Scores, bake stats, leaderboards and the game settings from
+# bakerank_config.json (cooldown, ranks, overlay folder, legendary rate),
+# saved per the durability mode - set up the same way as in the GUI
+engine = setup_engine(runtime_settings, broadcast_to_overlays, DB_PATH)
 
-async def broadcast_to_overlays(message):
-    """Send message to all connected overlays"""
-    if overlay_clients:
-        data = json.dumps(message)
-        await asyncio.gather(*[client.send(data) for client in overlay_clients], return_exceptions=True)
+# ============ WEBSOCKET SERVER (BUILT-IN) ============
+# Server code lives in bakerank_overlay.py; broadcast_to_overlays() sends
+# directly or through the overlay process depending on overlay_mode.
 
 async def start_overlay_server():
     """Start the WebSocket server for overlays"""
-    async with websockets.serve(handle_overlay_connection, "0.0.0.0", 8765):
-        print("🍞 Overlay server started on ws://localhost:8765")
-        await asyncio.Future()  # Run forever
+    await serve_overlays(runtime_settings, on_ready=lambda: print("🍞 Overlay server started on ws://localhost:8765"))
 
 # ======================================================
 
 def get_available_baked_goods():
-    """Scan the overlay folder for PNG files and return list of available items (excluding legendaries)"""
-    png_files = glob.glob(os.path.join(OVERLAY_FOLDER, "*.png"))
-    if not png_files:
-        # Fallback to default list if no PNGs found
-        return ["croissant.png", "donut.png", "Pancakes.png"]
-    # Exclude legendary items from normal pool
-    normal_items = [os.path.basename(f) for f in png_files if not os.path.basename(f).startswith("Legendary-")]
-    return normal_items if normal_items else [os.path.basename(f) for f in png_files]
+    """Normal items (excluding legendaries) found in the overlay folder"""
+    return engine.config.normal_items
 
 def get_legendary_baked_goods():
     """Get list of legendary baked goods (files starting with 'Legendary-')"""
-    png_files = glob.glob(os.path.join(OVERLAY_FOLDER, "Legendary-*.png"))
-    return [os.path.basename(f) for f in png_files]
+    return engine.config.legendary_items
 
 def choose_baked_good():
-    """Choose a baked good with 1% chance for legendary"""
-    legendary_items = get_legendary_baked_goods()
-    normal_items = get_available_baked_goods()
-    
-    # 1% chance for legendary (if any exist)
-    if legendary_items and random.random() < 0.01:
-        return random.choice(legendary_items), True
-    else:
-        return random.choice(normal_items), False
-
-def format_item_name(filename):
-    """Convert filename to display name (e.g., 'croissant.png' -> 'Croissant')"""
-    name = os.path.splitext(filename)[0]  # Remove .png extension
-    return name.replace("_", " ").replace("-", " ").title()
-
-# ============ TEXT FILE DATABASE ============
-def load_player_data():
-    """Load player data from text file (editable with Notepad)"""
-    if not os.path.exists(DB_PATH):
-        return {}
-    
-    players = {}
-    try:
-        with open(DB_PATH, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                parts = line.split('|')
-                if len(parts) == 3:
-                    username = parts[0].strip()
-                    bake_score = int(parts[1].strip())
-                    last_bake_time = float(parts[2].strip())
-                    players[username] = {
-                        'bake_score': bake_score,
-                        'last_bake_time': last_bake_time
-                    }
-    except Exception as e:
-        print(f"⚠️ Warning: Could not load database: {e}")
-    return players
-
-def save_player_data(players):
-    """Save player data to text file"""
-    try:
-        with open(DB_PATH, 'w', encoding='utf-8') as f:
-            f.write("# BakeRank Player Database - Edit with Notepad\n")
-            f.write("# Format: username | bake_score | last_bake_time\n")
-            f.write("# WARNING: Keep the | separators intact!\n\n")
-            for username, data in sorted(players.items(), key=lambda x: x[1]['bake_score'], reverse=True):
-                f.write(f"{username} | {data['bake_score']} | {data['last_bake_time']}\n")
-    except Exception as e:
-        print(f"❌ Error saving database: {e}")
-
-# Load initial data
-player_data = load_player_data()
-
-RANKS = [
-    (0, "Floury Beginner"),
-    (20, "Amateur Baker"),
-    (100, "Pastry Apprentice"),
-    (300, "Dough Master"),
-    (700, "Dessert Virtuoso"),
-    (1400, "Oven Overlord"),
-    (3000, "Legendary Patissier"),
-    (6000, "Yeast Beast"),
-    (12000, "Celestial Confectioner")
-]
+    """Choose a baked good (legendary chance comes from the game config)"""
+    return engine.config.choose_baked_good()
 
 def get_rank_title(score):
-    for threshold, title in reversed(RANKS):
-        if score >= threshold:
-            return title
-    return RANKS[0][1]
+    return engine.config.rank_title(score)
 
 class BakeRankBot(commands.Bot):
     def __init__(self):
         super().__init__(token=TOKEN, prefix="!", initial_channels=[CHANNEL])
+        self.admission = AdmissionController(engine.config.cooldown)
 
     async def event_ready(self):
         print(f"✅ Bot logged in as {self.nick}")
         print(f"📺 Listening to channel: {CHANNEL}")
-        print(f"🎮 Commands: !bake, !TopBakers")
+        print(f"🎮 Commands: !bake, !TopBakers, !mystats, !legendaries")
         print("-" * 50)
 
-    # ------------- CORE COMMANDS -----------------
+    def apply_config(self, config):
+        """Apply a reloaded game config without restarting the bot (one reference swap)"""
+        engine.config = config
+        self.admission.set_cooldown(config.cooldown)
+        print(f"🔄 Game settings reloaded ({len(config.normal_items)} items, cooldown {config.cooldown}s)")
+
+    # ------------- CHAT COMMANDS (see bakerank_chat.py) -----------------
     @commands.command(name="bake")
     async def bake(self, ctx):
-        username = ctx.author.name.lower()
-        now = time.time()
-
-        # Get player data
-        if username not in player_data:
-            player_data[username] = {'bake_score': 0, 'last_bake_time': 0}
-        
-        bake_score = player_data[username]['bake_score']
-        last_bake_time = player_data[username]['last_bake_time']
-
-        # ===== COOLDOWN ENABLED (60 seconds per user) =====
-        if now - last_bake_time < COOLDOWN:
-            remaining = int(COOLDOWN - (now - last_bake_time))
-            await ctx.send(f"⏳ @{username}, oven cooling... wait {remaining}s.")
-            return
-        # ==================================================
-
-        old_rank_title = get_rank_title(bake_score)
-        bake_score += 1
-        new_rank_title = get_rank_title(bake_score)
-
-        # Update player data
-        player_data[username]['bake_score'] = bake_score
-        player_data[username]['last_bake_time'] = now
-        save_player_data(player_data)
-
-        # Check if player ranked up
-        ranked_up = old_rank_title != new_rank_title
-        
-        # Choose baked good (1% chance for legendary)
-        bake_item, is_legendary = choose_baked_good()
-        item_display_name = format_item_name(bake_item)
-        
-        # Determine if explosion should trigger
-        trigger_explosion = ranked_up or is_legendary
-        
-        # Console output for streamer visibility
-        if is_legendary:
-            print(f"✨ {username} baked a LEGENDARY {item_display_name}! ✨")
-        else:
-            print(f"🍞 {username} baked a {item_display_name}!")
-            
-        if ranked_up:
-            print(f"🎉 {username} ranked up to {new_rank_title}!")
-        
-        # Chat message
-        if is_legendary:
-            await ctx.send(f"✨ @{username} baked a LEGENDARY {item_display_name}! ✨ ({new_rank_title}) | Score: {int(bake_score)}")
-        else:
-            await ctx.send(f"🍞 @{username} baked a {item_display_name}! ({new_rank_title}) | Score: {int(bake_score)}")
-
-        # Send bake event to overlay
-        message = {
-            "event": "bake",
-            "user": username,
-            "rank": new_rank_title,
-            "score": int(bake_score),
-            "item": bake_item,
-            "is_legendary": is_legendary,
-            "trigger_explosion": trigger_explosion,
-            "ranked_up": ranked_up
-        }
-        print(f"📤 Sending to overlay: {bake_item}")
-        await broadcast_to_overlays(message)
+        await bake_command(ctx, engine, self.admission, print)
 
     @commands.command(name="TopBakers")
-    async def topbakers(self, ctx):
-        await self.send_leaderboard_to_chat(ctx)
+    async def topbakers(self, ctx, window="all"):
+        await topbakers_command(ctx, engine, window)
 
-    # ------------- HELPER METHODS -----------------
-    async def fetch_leaderboard(self):
-        # Sort players by score, get top 5
-        sorted_players = sorted(player_data.items(), key=lambda x: x[1]['bake_score'], reverse=True)[:5]
-        board = []
-        for username, data in sorted_players:
-            board.append({
-                "username": username,
-                "score": int(data['bake_score']),
-                "title": get_rank_title(data['bake_score'])
-            })
-        return board
+    @commands.command(name="mystats")
+    async def mystats(self, ctx):
+        await mystats_command(ctx, engine)
 
-    async def send_leaderboard_to_chat(self, ctx):
-        board = await self.fetch_leaderboard()
-        if not board:
-            await ctx.send("No bakers yet.")
-            return
-        medals = ["🥇", "🥈", "🥉", "4️⃣", "5️⃣"]
-        msg = " | ".join(
-            f"{medals[i]} {b['username']} ({b['title']}) - {b['score']}"
-            for i, b in enumerate(board)
-        )
-        await ctx.send(msg)
+    @commands.command(name="legendaries")
+    async def legendaries(self, ctx):
+        await legendaries_command(ctx, engine)
 
 # ------------------------------
 async def main():
     """Run both the bot and overlay server together"""
-    # Start overlay server in background
-    overlay_task = asyncio.create_task(start_overlay_server())
+    overlay_process = None
+    if runtime_settings['overlay_mode'] == "process":
+        # Overlay server in its own process; the bot only publishes events to it
+        overlay_process = OverlayProcess(runtime_settings)
+        overlay_process.start()
+        print("🍞 Overlay server process started on ws://localhost:8765")
+        publisher = OverlayPublisher(runtime_settings['overlay_ipc_port'])
+        use_overlay_publisher(publisher)
+        overlay_tasks = [asyncio.create_task(publisher.run()),
+                         asyncio.create_task(overlay_process.supervise())]
+    else:
+        # Start overlay server in background
+        overlay_tasks = [asyncio.create_task(start_overlay_server())]
     
     # Start bot
     bot = BakeRankBot()
     bot_task = asyncio.create_task(bot.start())
+
+    # Watch event loop lag so admission control can shed load
+    lag_task = asyncio.create_task(bot.admission.watch_loop_lag())
+
+    # Hot-reload game settings when bakerank_config.json or the overlay folder changes
+    watcher = ConfigWatcher(CONFIG_FILE, engine.config, bot.apply_config)
+    config_task = asyncio.create_task(watcher.watch())
+
+    # Write bakes to disk per the durability mode
+    persist_task = asyncio.create_task(engine.persistence.run())
     
     # Run both forever
-    await asyncio.gather(overlay_task, bot_task)
+    try:
+        await asyncio.gather(*overlay_tasks, bot_task, lag_task, config_task, persist_task)
+    finally:
+        if overlay_process:
+            overlay_process.stop()
 
 if __name__ == "__main__":
     # Single instance check - ensure only one bot runs at a time
@@ -318,7 +189,7 @@ if __name__ == "__main__":
         sys.exit(1)
     
     try:
-        asyncio.run(main())
+        run_event_loop(main, runtime_settings['event_loop'])
     except KeyboardInterrupt:
         print("\n🛑 Bot stopped by user.")
     except Exception as e:
@@ -333,6 +204,8 @@ if __name__ == "__main__":
         print("=" * 50)
         input("Press Enter to exit...")
     finally:
+        # Save any bakes still waiting for a group commit / periodic write
+        engine.persistence.close()
         try:
             lock_socket.close()
         except:
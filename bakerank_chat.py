@@ -0,0 +1,110 @@
+import os
+import time
+
+from bakerank_admission import DELAY, DROP
+from bakerank_engine import COOLING_DOWN
+from bakerank_leaderboards import WINDOW_LABELS, parse_window
+
+# ============ CHAT COMMANDS ============
+# What !bake, !TopBakers, !mystats and !legendaries say in chat, shared by
+# the terminal bot and the GUI so the two front-ends can't drift apart.
+# `ctx` only needs .author.name and an async .send(); `log` is print in
+# the terminal bot and the activity log in the GUI.
+
+MEDALS = ["🥇", "🥈", "🥉", "4️⃣", "5️⃣"]
+
+
+def format_item_name(filename):
+    """Convert filename to display name (e.g., 'croissant.png' -> 'Croissant')"""
+    name = os.path.splitext(filename)[0]  # Remove .png extension
+    return name.replace("_", " ").replace("-", " ").title()
+
+
+async def bake_command(ctx, engine, admission, log=print):
+    username = ctx.author.name.lower()
+    now = time.time()
+
+    # Admission control: drop cooldown spam and shed raids before any work
+    decision, remaining = admission.admit(username, now)
+    if decision == DROP:
+        return
+    if decision == DELAY:
+        await ctx.send(f"⏳ @{username}, oven cooling... wait {int(remaining)}s.")
+        return
+
+    result = engine.bake(username, now)
+    if result.status == COOLING_DOWN:
+        admission.sync_cooldown(username, result.last_bake_time)
+        await ctx.send(f"⏳ @{username}, oven cooling... wait {int(result.remaining)}s.")
+        return
+
+    item_display_name = format_item_name(result.item)
+    if result.is_legendary:
+        log(f"✨ {username} baked a LEGENDARY {item_display_name}! ✨")
+    else:
+        log(f"🍞 {username} baked a {item_display_name}!")
+    if result.ranked_up:
+        log(f"🎉 {username} ranked up to {result.rank}!")
+
+    # Save (per the durability mode) before confirming the bake in chat
+    await engine.save([result])
+
+    if result.is_legendary:
+        await ctx.send(f"✨ @{username} baked a LEGENDARY {item_display_name}! ✨ ({result.rank}) | Score: {int(result.score)}")
+    else:
+        await ctx.send(f"🍞 @{username} baked a {item_display_name}! ({result.rank}) | Score: {int(result.score)}")
+
+    # Send the bake event to overlay - after the reply, so slow overlays never delay chat
+    await engine.announce([result])
+
+
+async def topbakers_command(ctx, engine, window="all"):
+    window_name = parse_window(window)
+    if not window_name:
+        await ctx.send("Usage: !TopBakers [all | session | day | week]")
+        return
+    # Top 5 from the window's incrementally kept top-K index
+    board = engine.leaderboard(window_name, len(MEDALS))
+    if not board:
+        await ctx.send("No bakers yet.")
+        return
+    msg = " | ".join(
+        f"{MEDALS[i]} {b['username']} ({b['title']}) - {b['score']}"
+        for i, b in enumerate(board)
+    )
+    if window_name != "all":
+        msg = f"📅 {WINDOW_LABELS[window_name]}: {msg}"
+    await ctx.send(msg)
+
+
+async def mystats_command(ctx, engine):
+    username = ctx.author.name.lower()
+    data = engine.player_data.get(username)
+    if not data or not data['bake_score']:
+        await ctx.send(f"🍞 @{username}, no bakes yet - type !bake to start!")
+        return
+    score = int(data['bake_score'])
+    bake_stats = engine.stats
+    stats = bake_stats.get(username)
+    if not stats:
+        # Scored before bake stats existed and hasn't baked since
+        await ctx.send(f"📊 @{username}: {score} bakes | Item and streak stats start with your next !bake")
+        return
+    item, count = bake_stats.favorite_item(stats)
+    streak = bake_stats.current_streak(stats, time.time())
+    since = time.strftime("%Y-%m-%d", time.localtime(stats.first_bake_time))
+    # Bakes from before bake stats existed only show up in the score
+    since_label = "Baking since" if stats.bakes >= score else "Stats since"
+    await ctx.send(f"📊 @{username}: {score} bakes | ✨ {stats.legendary_hits} legendary | "
+                   f"Favorite: {format_item_name(item)} ({count}) | 🔥 Streak: {streak} days "
+                   f"(best {stats.best_streak}) | {since_label} {since}")
+
+
+async def legendaries_command(ctx, engine):
+    bake_stats = engine.stats
+    top_user, top_hits = bake_stats.top_legendary()
+    if not top_user:
+        await ctx.send("✨ No legendaries baked yet!")
+        return
+    await ctx.send(f"✨ {bake_stats.total_legendaries} legendaries out of {bake_stats.total_bakes} bakes | "
+                   f"Luckiest baker: {top_user} ({top_hits})")
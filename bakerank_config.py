@@ -0,0 +1,170 @@
+import asyncio
+import bisect
+import glob
+import json
+import os
+import random
+
+# ============ GAME CONFIGURATION ============
+# Game settings live next to the GUI credentials in bakerank_config.json.
+# They are validated and precompiled into a GameConfig once, so the bake
+# path never touches the disk, and can be swapped in while the bot runs.
+
+CONFIG_FILE = "bakerank_config.json"
+CONFIG_CHECK_INTERVAL = 2.0  # seconds between config / overlay folder checks
+
+DEFAULT_RANKS = [
+    (0, "Floury Beginner"),
+    (20, "Amateur Baker"),
+    (100, "Pastry Apprentice"),
+    (300, "Dough Master"),
+    (700, "Dessert Virtuoso"),
+    (1400, "Oven Overlord"),
+    (3000, "Legendary Patissier"),
+    (6000, "Yeast Beast"),
+    (12000, "Celestial Confectioner")
+]
+
+DEFAULT_GAME_SETTINGS = {
+    'cooldown': 60,
+    'legendary_rate': 0.01,
+    'overlay_folder': "overlay",
+    'ranks': [list(rank) for rank in DEFAULT_RANKS]
+}
+
+FALLBACK_ITEMS = ["croissant.png", "donut.png", "Pancakes.png"]
+
+
+class GameConfig:
+    """Validated, ready-to-use game settings (treat as read-only)"""
+
+    def __init__(self, cooldown, legendary_rate, overlay_folder, ranks):
+        self.cooldown = cooldown
+        self.legendary_rate = legendary_rate
+        self.overlay_folder = overlay_folder
+        self.ranks = ranks
+        # Rank table: bisect over thresholds instead of a reversed scan
+        self.rank_thresholds = [threshold for threshold, _ in ranks]
+        self.rank_titles = [title for _, title in ranks]
+        # Sampling tables: scan the overlay folder once, not on every bake
+        self.normal_items, self.legendary_items = scan_baked_goods(overlay_folder)
+
+    def rank_title(self, score):
+        i = bisect.bisect_right(self.rank_thresholds, score) - 1
+        return self.rank_titles[i if i >= 0 else 0]
+
+    def choose_baked_good(self):
+        """Choose a baked good, legendary with probability legendary_rate"""
+        if self.legendary_items and random.random() < self.legendary_rate:
+            return random.choice(self.legendary_items), True
+        return random.choice(self.normal_items), False
+
+
+def scan_baked_goods(overlay_folder):
+    """Return (normal_items, legendary_items) from the overlay folder PNGs"""
+    png_files = [os.path.basename(f) for f in glob.glob(os.path.join(overlay_folder, "*.png"))]
+    if not png_files:
+        return list(FALLBACK_ITEMS), []
+    legendary_items = [f for f in png_files if f.startswith("Legendary-")]
+    normal_items = [f for f in png_files if not f.startswith("Legendary-")]
+    return (normal_items if normal_items else png_files), legendary_items
+
+
+def build_game_config(settings):
+    """Validate a settings dict (missing keys use defaults) into a GameConfig.
+
+    Raises ValueError describing the first invalid setting.
+    """
+    merged = dict(DEFAULT_GAME_SETTINGS)
+    merged.update({k: v for k, v in settings.items() if k in DEFAULT_GAME_SETTINGS})
+
+    cooldown = merged['cooldown']
+    if isinstance(cooldown, bool) or not isinstance(cooldown, (int, float)) or cooldown < 0:
+        raise ValueError(f"cooldown must be a number >= 0, got {cooldown!r}")
+
+    rate = merged['legendary_rate']
+    if isinstance(rate, bool) or not isinstance(rate, (int, float)) or not 0 <= rate <= 1:
+        raise ValueError(f"legendary_rate must be between 0 and 1, got {rate!r}")
+
+    folder = merged['overlay_folder']
+    if not isinstance(folder, str) or not folder:
+        raise ValueError(f"overlay_folder must be a folder name, got {folder!r}")
+
+    ranks = []
+    for rank in merged['ranks'] or []:
+        if (not isinstance(rank, (list, tuple)) or len(rank) != 2
+                or isinstance(rank[0], bool) or not isinstance(rank[0], int)
+                or not isinstance(rank[1], str)):
+            raise ValueError(f"each rank must be [threshold, title], got {rank!r}")
+        ranks.append((rank[0], rank[1]))
+    if not ranks:
+        raise ValueError("ranks must list at least one [threshold, title]")
+    ranks.sort()
+    thresholds = [threshold for threshold, _ in ranks]
+    if len(set(thresholds)) != len(thresholds):
+        raise ValueError("rank thresholds must be unique")
+
+    return GameConfig(cooldown, rate, folder, ranks)
+
+
+def load_game_config(path=CONFIG_FILE):
+    """Load game settings from the JSON config file (defaults if missing)"""
+    settings = {}
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            settings = json.load(f)
+        if not isinstance(settings, dict):
+            raise ValueError(f"{path} must contain a JSON object")
+    return build_game_config(settings)
+
+
+def load_game_config_or_defaults(path=CONFIG_FILE, on_error=print):
+    """load_game_config(), or the defaults (with a warning) if the file is broken"""
+    try:
+        return load_game_config(path)
+    except (OSError, ValueError) as e:
+        on_error(f"⚠️ Warning: Could not load game settings, using defaults: {e}")
+        return build_game_config({})
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+class ConfigWatcher:
+    """Polls the config file and overlay folder and hot-swaps a new GameConfig.
+
+    Loading runs in the default executor so a slow disk never blocks the
+    event loop; on_change(config) is called on the loop once it is ready,
+    on_error(message) if the edited file does not validate.
+    """
+
+    def __init__(self, path, config, on_change, on_error=print):
+        self.path = path
+        self.config = config
+        self.on_change = on_change
+        self.on_error = on_error
+        self.stamp = self._stamp()
+
+    def _stamp(self):
+        return _mtime(self.path), _mtime(self.config.overlay_folder)
+
+    async def watch(self, interval=CONFIG_CHECK_INTERVAL):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            stamp = self._stamp()
+            if stamp == self.stamp:
+                continue
+            self.stamp = stamp
+            try:
+                config = await loop.run_in_executor(None, load_game_config, self.path)
+            except (OSError, ValueError) as e:
+                self.on_error(f"⚠️ Config not reloaded: {e}")
+                continue
+            self.config = config
+            self.stamp = self._stamp()
+            self.on_change(config)
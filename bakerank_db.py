@@ -0,0 +1,220 @@
+import asyncio
+import os
+from operator import itemgetter
+
+# ============ TEXT FILE DATABASE ============
+# Shared by the terminal bot, the GUI and the offline analytics tool so
+# there is exactly one parser for bakerank_data.txt.
+
+DB_HEADER = (
+    "# BakeRank Player Database - Edit with Notepad\n"
+    "# Format: username | bake_score | last_bake_time\n"
+    "# WARNING: Keep the | separators intact!\n\n"
+)
+
+
+def iter_player_records(lines):
+    """Yield (username, bake_score, last_bake_time) for each player line"""
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        parts = line.split('|')
+        if len(parts) == 3:
+            yield parts[0].strip(), int(parts[1].strip()), float(parts[2].strip())
+
+
+def load_player_data(path):
+    """Load player data from text file (editable with Notepad)"""
+    if not os.path.exists(path):
+        return {}
+
+    players = {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for username, bake_score, last_bake_time in iter_player_records(f):
+                players[username] = {
+                    'bake_score': bake_score,
+                    'last_bake_time': last_bake_time
+                }
+    except Exception as e:
+        print(f"⚠️ Warning: Could not load database: {e}")
+    return players
+
+
+def format_player_line(username, data):
+    return f"{username} | {data['bake_score']} | {data['last_bake_time']}\n"
+
+
+def format_player_lines(scored_lines):
+    """Player database file contents from (bake_score, line) pairs, highest score first"""
+    ordered = sorted(scored_lines, key=itemgetter(0), reverse=True)
+    return DB_HEADER + "".join([line for _, line in ordered])
+
+
+def format_player_data(players):
+    """Player database file contents, highest score first"""
+    return format_player_lines((data['bake_score'], format_player_line(username, data))
+                               for username, data in players.items())
+
+
+def save_player_data(players, path, durable=False):
+    """Save player data to text file"""
+    try:
+        atomic_write(path, format_player_data(players), durable)
+    except Exception as e:
+        print(f"❌ Error saving database: {e}")
+
+
+# ============ CRASH-SAFE WRITES ============
+def _fsync_dir(path):
+    """Make a rename durable (not possible - nor needed - on Windows)"""
+    if os.name == 'nt':
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path, text, durable=False):
+    """Write to a temp file and rename it over `path`, so a crash or power
+    cut leaves either the old or the new file - never a truncated one.
+
+    The temp file always reaches the disk before the rename. `durable`
+    also syncs the directory, so the rename itself survives a power cut
+    (without it the previous version may come back instead).
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    if durable:
+        _fsync_dir(path)
+
+
+def write_snapshot(files, durable=False):
+    """Atomically write every (path, text) pair"""
+    for path, text in files:
+        atomic_write(path, text, durable)
+
+
+def render_snapshot(render, durable=False):
+    """Build the files of a captured snapshot and write them (worker thread)"""
+    write_snapshot(render(), durable)
+
+
+# ============ DURABILITY MODES ============
+DURABILITY_MODES = ("every_bake", "group_commit", "best_effort")
+
+
+class SnapshotWriter:
+    """Decides when bakes reach the disk.
+
+    every_bake   - commit() returns only once the bake is fsync'd
+    group_commit - bakes within group_ms (or group_bakes of them) share one fsync'd write
+    best_effort  - run() writes every `interval` seconds, skipping the
+                   directory fsync (a power cut may bring back the previous write)
+
+    `snapshot()` runs on the event loop and must stay cheap: it captures
+    the game data (so it cannot change mid-write) and returns a function
+    that builds the [(path, text)] files. Building and writing them
+    happens in a worker thread, so a flush never stalls chat handling.
+    """
+
+    def __init__(self, snapshot, mode="group_commit", group_ms=200, group_bakes=50,
+                 interval=5.0, on_error=print):
+        if mode not in DURABILITY_MODES:
+            raise ValueError(f"durability must be one of {', '.join(DURABILITY_MODES)}, got {mode!r}")
+        self.snapshot = snapshot
+        self.mode = mode
+        self.group_delay = group_ms / 1000.0
+        self.group_bakes = group_bakes
+        self.interval = interval
+        self.on_error = on_error
+        self.pending = 0
+        self.writes = 0
+        self.timer = None
+        self.lock = None
+        self.loop = None
+
+    @classmethod
+    def from_settings(cls, snapshot, settings, on_error=print):
+        mode = settings['durability']
+        if mode not in DURABILITY_MODES:
+            on_error(f"⚠️ Unknown durability '{mode}', using group_commit")
+            mode = "group_commit"
+        return cls(snapshot, mode, settings['group_commit_ms'], settings['group_commit_bakes'],
+                   settings['best_effort_interval'], on_error)
+
+    async def commit(self, bakes=1):
+        """Record that `bakes` bakes changed the game data"""
+        self.pending += bakes
+        if self.mode == "every_bake":
+            await self.flush()
+        elif self.mode == "group_commit":
+            if self.pending >= self.group_bakes:
+                self._schedule(0)
+            elif self.timer is None:
+                self._schedule(self.group_delay)
+
+    def _schedule(self, delay):
+        if self.timer is not None:
+            self.timer.cancel()
+        loop = asyncio.get_running_loop()
+        self.timer = loop.call_later(delay, lambda: asyncio.ensure_future(self.flush()))
+
+    def _get_lock(self):
+        # One lock per event loop: the GUI starts a fresh loop on every bot start
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.loop = loop
+            self.lock = asyncio.Lock()
+        return self.lock
+
+    async def flush(self):
+        """Write everything committed so far in one snapshot"""
+        async with self._get_lock():
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if not self.pending:
+                return
+            bakes = self.pending
+            self.pending = 0
+            render = self.snapshot()
+            try:
+                await self.loop.run_in_executor(None, render_snapshot, render, self.mode != "best_effort")
+            except OSError as e:
+                # Keep the bakes pending so the next flush (or close()) retries them
+                self.pending += bakes
+                self.on_error(f"❌ Error saving database: {e}")
+                return
+            self.writes += 1
+
+    async def run(self):
+        """Periodic writer for best_effort (and a safety net for the other modes)"""
+        while True:
+            await asyncio.sleep(self.interval)
+            if self.pending:
+                await self.flush()
+
+    def close(self):
+        """Write anything still pending, synchronously (call once the loop has stopped)"""
+        # Forget the stopped loop: a timer left from it would block every later group commit
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        self.loop = None
+        self.lock = None
+        if self.pending:
+            try:
+                render_snapshot(self.snapshot(), self.mode != "best_effort")
+            except OSError as e:
+                self.on_error(f"❌ Error saving database: {e}")
+                return
+            self.pending = 0
+            self.writes += 1
@@ -0,0 +1,231 @@
+import time
+
+import bakerank_db
+from bakerank_config import CONFIG_FILE, load_game_config_or_defaults
+from bakerank_leaderboards import LEADERBOARD_PATH, Leaderboards, dumps_leaderboards, load_leaderboards
+from bakerank_stats import STATS_PATH, BakeStats, dumps_bake_stats, load_bake_stats
+
+# ============ GAME ENGINE ============
+# The bake rules with no Twitch attached. The bot, the GUI, chat log
+# replays and bulk imports all feed (username, timestamp) events in here
+# and render the returned BakeResults their own way.
+
+DB_PATH = "bakerank_data.txt"
+BATCH_OVERLAY_EVENTS = 20  # most overlay animations one batch may trigger
+
+BAKED = "baked"
+COOLING_DOWN = "cooling_down"
+
+
+class BakeResult:
+    """What one bake did: new score, rank change and the item baked"""
+    __slots__ = ('username', 'status', 'time', 'score', 'old_rank', 'rank',
+                 'item', 'is_legendary', 'last_bake_time', 'remaining')
+
+    def __init__(self, username, status, now, score, old_rank, rank,
+                 item=None, is_legendary=False, last_bake_time=0, remaining=0):
+        self.username = username
+        self.status = status
+        self.time = now
+        self.score = score
+        self.old_rank = old_rank
+        self.rank = rank
+        self.item = item
+        self.is_legendary = is_legendary
+        self.last_bake_time = last_bake_time  # previous bake (the one blocking it on COOLING_DOWN)
+        self.remaining = remaining            # cooldown seconds left on COOLING_DOWN
+
+    @property
+    def baked(self):
+        return self.status == BAKED
+
+    @property
+    def ranked_up(self):
+        return self.baked and self.rank != self.old_rank
+
+    @property
+    def trigger_explosion(self):
+        return self.ranked_up or self.is_legendary
+
+    def overlay_message(self):
+        """The "bake" event the OBS overlay animates"""
+        return {
+            "event": "bake",
+            "user": self.username,
+            "rank": self.rank,
+            "score": int(self.score),
+            "item": self.item,
+            "is_legendary": self.is_legendary,
+            "trigger_explosion": self.trigger_explosion,
+            "ranked_up": self.ranked_up
+        }
+
+
+class BakeEngine:
+    """Scores, bake stats and leaderboards plus the rules that change them.
+
+    bake() / bake_many() only touch memory and return BakeResults;
+    publish() then saves and announces a whole batch at once through the
+    optional `persistence` (SnapshotWriter) and `broadcast` (async
+    callable taking an overlay message). Chat commands call save() and
+    announce() themselves, so the chat reply goes out in between.
+    """
+
+    def __init__(self, config, player_data=None, stats=None, boards=None):
+        self.config = config
+        self.player_data = player_data if player_data is not None else {}
+        self.stats = stats if stats is not None else BakeStats()
+        self.leaderboards = boards if boards is not None else Leaderboards(self.player_data)
+        self.persistence = None
+        self.broadcast = None
+        # Serialized rows of the last snapshot; only players baked since then are redone
+        self.dirty = set()
+        self.saved_lines = {username: (data['bake_score'], bakerank_db.format_player_line(username, data))
+                            for username, data in self.player_data.items()}
+        self.saved_stats = {username: self.stats.player_json(username) for username in self.stats.players}
+
+    def bake(self, username, now=None):
+        """Apply one !bake by `username` at `now`"""
+        if now is None:
+            now = time.time()
+        return self._bake(username.lower(), now, None)
+
+    def bake_many(self, events):
+        """Apply (username, timestamp) events, oldest first; one BakeResult each"""
+        backfilled = {}
+        bake = self._bake
+        return [bake(username.lower(), now, backfilled) for username, now in events]
+
+    def _bake(self, username, now, backfilled):
+        config = self.config
+        data = self.player_data.get(username)
+        if data is None:
+            data = self.player_data[username] = {'bake_score': 0, 'last_bake_time': 0}
+
+        bake_score = data['bake_score']
+        last_bake_time = data['last_bake_time']
+        old_rank = config.rank_title(bake_score)
+
+        # Per user cooldown. A bake older than the player's last one (e.g. a
+        # replayed stream the bot missed) is backfilled: it needs a full
+        # cooldown before that bake, and after the previous bake backfilled
+        # in the same batch, but never moves last_bake_time back.
+        blocking = last_bake_time
+        if now < last_bake_time:
+            previous = backfilled.get(username) if backfilled is not None else None
+            if last_bake_time - now < config.cooldown:
+                wait = config.cooldown - (last_bake_time - now)
+            elif previous is not None and now - previous < config.cooldown:
+                blocking = previous
+                wait = config.cooldown - (now - previous)
+            else:
+                wait = 0
+        else:
+            wait = config.cooldown - (now - last_bake_time)
+        if wait > 0:
+            return BakeResult(username, COOLING_DOWN, now, bake_score, old_rank, old_rank,
+                              last_bake_time=blocking, remaining=wait)
+
+        bake_score += 1
+        data['bake_score'] = bake_score
+        if now >= last_bake_time:
+            data['last_bake_time'] = now
+        elif backfilled is not None:
+            backfilled[username] = now
+        self.leaderboards.record(username, bake_score, now)
+
+        item, is_legendary = config.choose_baked_good()
+        self.stats.record(username, item, is_legendary, now)
+        self.dirty.add(username)
+        return BakeResult(username, BAKED, now, bake_score, old_rank, config.rank_title(bake_score),
+                          item, is_legendary, last_bake_time)
+
+    async def publish(self, results, announce_limit=BATCH_OVERLAY_EVENTS):
+        """Save and announce a batch of results: one persistence commit for
+        the whole batch, and at most `announce_limit` overlay animations
+        (only rank-ups and legendaries when there are more bakes than that)"""
+        await self.save(results)
+        await self.announce(results, announce_limit)
+
+    async def save(self, results):
+        """One persistence commit for every bake in `results`"""
+        baked = sum(result.baked for result in results)
+        if baked and self.persistence is not None:
+            await self.persistence.commit(baked)
+
+    async def announce(self, results, announce_limit=BATCH_OVERLAY_EVENTS):
+        """Send the overlay animations of `results` (see publish())"""
+        if self.broadcast is None:
+            return
+        baked = [result for result in results if result.baked]
+        if len(baked) > announce_limit:
+            baked = [result for result in baked if result.trigger_explosion][-announce_limit:]
+        for result in baked:
+            await self.broadcast(result.overlay_message())
+
+    # ------------- QUERIES -----------------
+    def leaderboard(self, window='all', limit=5, now=None):
+        """Top players of a window with their all-time rank titles"""
+        board = []
+        for username, score in self.leaderboards.top(window, limit, now):
+            total = self.player_data.get(username, {}).get('bake_score', score)
+            board.append({
+                "username": username,
+                "score": int(score),
+                "title": self.config.rank_title(total)
+            })
+        return board
+
+    # ------------- PERSISTENCE -----------------
+    def persist_with(self, settings, db_path=DB_PATH, on_error=print):
+        """Save to `db_path` (plus stats and leaderboards) per the durability
+        mode in the runtime `settings`; returns the new SnapshotWriter"""
+        self.persistence = bakerank_db.SnapshotWriter.from_settings(
+            lambda: self.snapshot(db_path), settings, on_error)
+        return self.persistence
+
+    def snapshot(self, db_path=DB_PATH, stats_path=STATS_PATH, leaderboard_path=LEADERBOARD_PATH):
+        """Capture player scores, bake stats and leaderboard windows and
+        return a function that builds their [(path, text)] files.
+
+        Cheap enough for the event loop: only players baked since the last
+        snapshot are re-serialized. Sorting and joining the whole files is
+        left to the returned function, which SnapshotWriter runs in a
+        worker thread.
+        """
+        for username in self.dirty:
+            data = self.player_data.get(username)
+            if data is not None:
+                self.saved_lines[username] = (data['bake_score'], bakerank_db.format_player_line(username, data))
+            if username in self.stats.players:
+                self.saved_stats[username] = self.stats.player_json(username)
+        self.dirty.clear()
+        lines = list(self.saved_lines.values())
+        entries = list(self.saved_stats.values())
+        items = list(self.stats.items)
+        boards = self.leaderboards.to_json()
+
+        def render():
+            return [
+                (db_path, bakerank_db.format_player_lines(lines)),
+                (stats_path, dumps_bake_stats(items, entries)),
+                (leaderboard_path, dumps_leaderboards(boards))
+            ]
+        return render
+
+
+def load_engine(config, db_path=DB_PATH, stats_path=STATS_PATH, leaderboard_path=LEADERBOARD_PATH):
+    """Engine with the saved player database, bake stats and leaderboards"""
+    player_data = bakerank_db.load_player_data(db_path)
+    return BakeEngine(config, player_data, load_bake_stats(stats_path),
+                      load_leaderboards(player_data, leaderboard_path))
+
+
+def setup_engine(runtime_settings, broadcast=None, db_path=DB_PATH, config_path=CONFIG_FILE, log=print):
+    """The engine the bot and the GUI run on: game settings (defaults if
+    the config file is broken), saved game data, saving per the durability
+    mode and overlay announcements through `broadcast`"""
+    engine = load_engine(load_game_config_or_defaults(config_path, log), db_path)
+    engine.persist_with(runtime_settings, db_path, log)
+    engine.broadcast = broadcast
+    return engine
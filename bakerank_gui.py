@@ -1,134 +1,63 @@
 import asyncio
-import time
 import json
 import random
 import os
-import glob
 import sys
 from datetime import datetime
+
+# The EXE also runs the overlay server process (overlay_mode "process"):
+# hand over before PyQt5 or the game data are loaded
+from bakerank_overlay import OVERLAY_PROCESS_FLAG, overlay_process_main
+if __name__ == "__main__" and sys.argv[1:2] == [OVERLAY_PROCESS_FLAG]:
+    sys.exit(overlay_process_main(sys.argv[2:]))
+
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QLineEdit, QPushButton, 
                              QTextEdit, QGroupBox, QMessageBox)
-from PyQt5.QtCore import QThread, pyqtSignal, Qt
+from PyQt5.QtCore import QThread, QTimer, pyqtSignal, Qt
 from PyQt5.QtGui import QFont
-import websockets
 from twitchio.ext import commands
+from bakerank_admission import AdmissionController
+from bakerank_chat import bake_command, format_item_name, legendaries_command, mystats_command, topbakers_command
+from bakerank_config import CONFIG_FILE, ConfigWatcher, load_game_config
+from bakerank_engine import setup_engine
+from bakerank_runtime import cancel_all_tasks, load_runtime_settings, new_event_loop
+from bakerank_overlay import (SUPERVISE_INTERVAL, OverlayProcess, OverlayPublisher,
+                              broadcast_to_overlays, serve_overlays, use_overlay_publisher)
 
-CONFIG_FILE = "bakerank_config.json"
 DB_PATH = "bakerank_data.txt"
-OVERLAY_FOLDER = "overlay"
-COOLDOWN = 60
 
-# ============ TEXT FILE DATABASE ============
-def load_player_data():
-    """Load player data from text file"""
-    if not os.path.exists(DB_PATH):
-        return {}
-    
-    players = {}
-    try:
-        with open(DB_PATH, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                parts = line.split('|')
-                if len(parts) == 3:
-                    username = parts[0].strip()
-                    bake_score = int(parts[1].strip())
-                    last_bake_time = float(parts[2].strip())
-                    players[username] = {
-                        'bake_score': bake_score,
-                        'last_bake_time': last_bake_time
-                    }
-    except Exception as e:
-        print(f"⚠️ Warning: Could not load database: {e}")
-    return players
+# Event loop backend, overlay server tuning and durability (re-read on every Start Bot)
+runtime_settings = load_runtime_settings(CONFIG_FILE)
 
-def save_player_data(players):
-    """Save player data to text file"""
-    try:
-        with open(DB_PATH, 'w', encoding='utf-8') as f:
-            f.write("# BakeRank Player Database - Edit with Notepad\n")
-            f.write("# Format: username | bake_score | last_bake_time\n")
-            f.write("# WARNING: Keep the | separators intact!\n\n")
-            for username, data in sorted(players.items(), key=lambda x: x[1]['bake_score'], reverse=True):
-                f.write(f"{username} | {data['bake_score']} | {data['last_bake_time']}\n")
-    except Exception as e:
-        print(f"❌ Error saving database: {e}")
-
-player_data = load_player_data()
+# ============ GAME ENGINE ============
+# Scores, bake stats, leaderboards and the game settings from
+# bakerank_config.json (cooldown, ranks, overlay folder, legendary rate),
+# saved per the durability mode - set up the same way as in the terminal bot
+engine = setup_engine(runtime_settings, broadcast_to_overlays, DB_PATH)
 
 # ============ BAKED GOODS HELPERS ============
 def get_available_baked_goods():
-    """Scan overlay folder for normal PNG files"""
-    png_files = glob.glob(os.path.join(OVERLAY_FOLDER, "*.png"))
-    if not png_files:
-        return ["croissant.png", "donut.png", "Pancakes.png"]
-    normal_items = [os.path.basename(f) for f in png_files if not os.path.basename(f).startswith("Legendary-")]
-    return normal_items if normal_items else [os.path.basename(f) for f in png_files]
+    """Normal PNG items from the overlay folder"""
+    return engine.config.normal_items
 
 def get_legendary_baked_goods():
     """Get legendary baked goods"""
-    png_files = glob.glob(os.path.join(OVERLAY_FOLDER, "Legendary-*.png"))
-    return [os.path.basename(f) for f in png_files]
+    return engine.config.legendary_items
 
 def choose_baked_good():
-    """Choose a baked good with 1% legendary chance"""
-    legendary_items = get_legendary_baked_goods()
-    normal_items = get_available_baked_goods()
-    
-    if legendary_items and random.random() < 0.01:
-        return random.choice(legendary_items), True
-    else:
-        return random.choice(normal_items), False
-
-def format_item_name(filename):
-    """Convert filename to display name"""
-    name = os.path.splitext(filename)[0]
-    return name.replace("_", " ").replace("-", " ").title()
+    """Choose a baked good using the configured legendary chance"""
+    return engine.config.choose_baked_good()
 
 # ============ RANK SYSTEM ============
-RANKS = [
-    (0, "Floury Beginner"),
-    (20, "Amateur Baker"),
-    (100, "Pastry Apprentice"),
-    (300, "Dough Master"),
-    (700, "Dessert Virtuoso"),
-    (1400, "Oven Overlord"),
-    (3000, "Legendary Patissier"),
-    (6000, "Yeast Beast"),
-    (12000, "Celestial Confectioner")
-]
-
 def get_rank_title(score):
-    for threshold, title in reversed(RANKS):
-        if score >= threshold:
-            return title
-    return RANKS[0][1]
+    return engine.config.rank_title(score)
 
 # ============ WEBSOCKET SERVER ============
-overlay_clients = set()
-
-async def handle_overlay_connection(websocket):
-    """Handle incoming overlay connections"""
-    overlay_clients.add(websocket)
-    try:
-        async for _ in websocket:
-            pass
-    finally:
-        overlay_clients.remove(websocket)
-
-async def broadcast_to_overlays(message):
-    """Send message to all connected overlays"""
-    if overlay_clients:
-        data = json.dumps(message)
-        await asyncio.gather(*[client.send(data) for client in overlay_clients], return_exceptions=True)
-
+# See bakerank_overlay.py (inline in the bot thread or in its own process)
 async def start_overlay_server():
     """Start WebSocket server"""
-    async with websockets.serve(handle_overlay_connection, "0.0.0.0", 8765):
-        await asyncio.Future()
+    await serve_overlays(runtime_settings)
 
 # ============ TWITCH BOT ============
 class BakeRankBot(commands.Bot):
@@ -136,94 +65,36 @@ class BakeRankBot(commands.Bot):
         super().__init__(token=token, prefix="!", initial_channels=[channel])
         self.log_callback = log_callback
         self.channel_name = channel
+        self.admission = AdmissionController(engine.config.cooldown)
 
     async def event_ready(self):
         self.log_callback(f"✅ Bot logged in as {self.nick}")
         self.log_callback(f"📺 Connected to channel: {self.channel_name}")
-        self.log_callback(f"🎮 Commands: !bake, !TopBakers")
+        self.log_callback(f"🎮 Commands: !bake, !TopBakers, !mystats, !legendaries")
         self.log_callback("-" * 50)
 
+    def apply_config(self, config):
+        """Apply a new game config without restarting (call on the bot loop)"""
+        engine.config = config
+        self.admission.set_cooldown(config.cooldown)
+        self.log_callback(f"🔄 Game settings applied ({len(config.normal_items)} items, cooldown {config.cooldown}s)")
+
+    # Chat commands are shared with the terminal bot (see bakerank_chat.py)
     @commands.command(name="bake")
     async def bake(self, ctx):
-        username = ctx.author.name.lower()
-        now = time.time()
-
-        if username not in player_data:
-            player_data[username] = {'bake_score': 0, 'last_bake_time': 0}
-        
-        bake_score = player_data[username]['bake_score']
-        last_bake_time = player_data[username]['last_bake_time']
-
-        # COOLDOWN CHECK (60 seconds per user)
-        if now - last_bake_time < COOLDOWN:
-            remaining = int(COOLDOWN - (now - last_bake_time))
-            await ctx.send(f"⏳ @{username}, oven cooling... wait {remaining}s.")
-            return
-
-        old_rank_title = get_rank_title(bake_score)
-        bake_score += 1
-        new_rank_title = get_rank_title(bake_score)
-
-        player_data[username]['bake_score'] = bake_score
-        player_data[username]['last_bake_time'] = now
-        save_player_data(player_data)
-
-        ranked_up = old_rank_title != new_rank_title
-        bake_item, is_legendary = choose_baked_good()
-        item_display_name = format_item_name(bake_item)
-        trigger_explosion = ranked_up or is_legendary
-        
-        if is_legendary:
-            self.log_callback(f"✨ {username} baked a LEGENDARY {item_display_name}! ✨")
-        else:
-            self.log_callback(f"🍞 {username} baked a {item_display_name}!")
-            
-        if ranked_up:
-            self.log_callback(f"🎉 {username} ranked up to {new_rank_title}!")
-        
-        if is_legendary:
-            await ctx.send(f"✨ @{username} baked a LEGENDARY {item_display_name}! ✨ ({new_rank_title}) | Score: {int(bake_score)}")
-        else:
-            await ctx.send(f"🍞 @{username} baked a {item_display_name}! ({new_rank_title}) | Score: {int(bake_score)}")
-
-        message = {
-            "event": "bake",
-            "user": username,
-            "rank": new_rank_title,
-            "score": int(bake_score),
-            "item": bake_item,
-            "is_legendary": is_legendary,
-            "trigger_explosion": trigger_explosion,
-            "ranked_up": ranked_up
-        }
-        await broadcast_to_overlays(message)
+        await bake_command(ctx, engine, self.admission, self.log_callback)
 
     @commands.command(name="TopBakers")
-    async def topbakers(self, ctx):
-        await self.send_leaderboard_to_chat(ctx)
+    async def topbakers(self, ctx, window="all"):
+        await topbakers_command(ctx, engine, window)
 
-    async def fetch_leaderboard(self):
-        sorted_players = sorted(player_data.items(), key=lambda x: x[1]['bake_score'], reverse=True)[:5]
-        board = []
-        for username, data in sorted_players:
-            board.append({
-                "username": username,
-                "score": int(data['bake_score']),
-                "title": get_rank_title(data['bake_score'])
-            })
-        return board
+    @commands.command(name="mystats")
+    async def mystats(self, ctx):
+        await mystats_command(ctx, engine)
 
-    async def send_leaderboard_to_chat(self, ctx):
-        board = await self.fetch_leaderboard()
-        if not board:
-            await ctx.send("No bakers yet.")
-            return
-        medals = ["🥇", "🥈", "🥉", "4️⃣", "5️⃣"]
-        msg = " | ".join(
-            f"{medals[i]} {b['username']} ({b['title']}) - {b['score']}"
-            for i, b in enumerate(board)
-        )
-        await ctx.send(msg)
+    @commands.command(name="legendaries")
+    async def legendaries(self, ctx):
+        await legendaries_command(ctx, engine)
 
 # ============ BOT THREAD ============
 class BotThread(QThread):
@@ -236,26 +107,56 @@ class BotThread(QThread):
         self.channel = channel
         self.bot = None
         self.loop = None
+        self.watcher = None
         
     def log(self, message):
         self.log_signal.emit(message)
         
     def run(self):
         try:
-            self.loop = asyncio.new_event_loop()
+            self.loop, backend = new_event_loop(runtime_settings['event_loop'])
             asyncio.set_event_loop(self.loop)
+            self.log(f"⚙️ Event loop: {backend}")
             
-            # Start overlay server
-            overlay_task = self.loop.create_task(start_overlay_server())
-            self.log("🍞 Overlay server started on ws://localhost:8765")
+            if runtime_settings['overlay_mode'] == "process":
+                # The GUI runs the overlay server process; just publish events to it
+                publisher = OverlayPublisher(runtime_settings['overlay_ipc_port'])
+                use_overlay_publisher(publisher)
+                overlay_task = self.loop.create_task(publisher.run())
+            else:
+                # Start overlay server (and stop routing through a process from an earlier start)
+                use_overlay_publisher(None)
+                overlay_task = self.loop.create_task(start_overlay_server())
+                self.log("🍞 Overlay server started on ws://localhost:8765")
             
             # Start bot
             self.bot = BakeRankBot(self.token, self.channel, self.log)
             bot_task = self.loop.create_task(self.bot.start())
+            lag_task = self.loop.create_task(self.bot.admission.watch_loop_lag())
+
+            # Hot-reload game settings when the config file or overlay folder changes
+            self.watcher = ConfigWatcher(CONFIG_FILE, engine.config, self.bot.apply_config, self.log)
+            config_task = self.loop.create_task(self.watcher.watch())
+            persist_task = self.loop.create_task(engine.persistence.run())
             
-            self.loop.run_until_complete(asyncio.gather(overlay_task, bot_task))
+            self.loop.run_until_complete(asyncio.gather(overlay_task, bot_task, lag_task, config_task, persist_task))
         except Exception as e:
             self.error_signal.emit(str(e))
+        finally:
+            if self.loop:
+                # Close the Twitch and overlay connections, and let in-flight
+                # database writes finish before the GUI saves the rest
+                cancel_all_tasks(self.loop)
+                self.loop.run_until_complete(self.loop.shutdown_default_executor())
+
+    def apply_config(self, config):
+        """Hand a new game config to the running bot (callable from the GUI thread)"""
+        if self.loop and self.bot:
+            if self.watcher:
+                self.watcher.config = config
+            self.loop.call_soon_threadsafe(self.bot.apply_config, config)
+        else:
+            engine.config = config  # one reference swap, safe from any thread
             
     def stop(self):
         if self.loop:
@@ -266,6 +167,9 @@ class BakeRankGUI(QMainWindow):
     def __init__(self):
         super().__init__()
         self.bot_thread = None
+        self.overlay_process = None
+        self.overlay_timer = QTimer(self)
+        self.overlay_timer.timeout.connect(self.check_overlay_process)
         self.config = self.load_config()
         self.init_ui()
         
@@ -390,6 +294,10 @@ class BakeRankGUI(QMainWindow):
         self.test_explosion_btn.setStyleSheet("background-color: #FF9800; color: white; font-weight: bold; padding: 10px; border: none;")
         btn_layout.addWidget(self.test_explosion_btn)
         
+        self.reload_settings_btn = QPushButton("🔄 Reload Game Settings")
+        self.reload_settings_btn.clicked.connect(self.reload_game_settings)
+        btn_layout.addWidget(self.reload_settings_btn)
+        
         self.test_legendary_btn = QPushButton("✨ Test Legendary")
         self.test_legendary_btn.clicked.connect(self.test_legendary)
         self.test_legendary_btn.setStyleSheet("background-color: #FFD700; color: black; font-weight: bold; padding: 10px; border: none;")
@@ -426,14 +334,17 @@ class BakeRankGUI(QMainWindow):
         return {}
     
     def save_configuration(self):
-        config = {
+        # Keep game settings (cooldown, ranks, ...) that live in the same file
+        config = dict(self.load_config())
+        config.update({
             'token': self.token_input.text(),
             'client_id': self.client_input.text(),
             'channel': self.channel_input.text()
-        }
+        })
         try:
             with open(CONFIG_FILE, 'w') as f:
                 json.dump(config, f, indent=2)
+            self.config = config
             self.log("✅ Configuration saved successfully")
             QMessageBox.information(self, "Success", "Configuration saved!")
         except Exception as e:
@@ -452,6 +363,19 @@ class BakeRankGUI(QMainWindow):
         self.log("🍞 Starting BakeRank Bot...")
         self.log("=" * 50)
         
+        # Pick up event_loop / overlay_mode / durability edits made since the last start
+        global runtime_settings
+        runtime_settings = load_runtime_settings(CONFIG_FILE)
+        engine.persist_with(runtime_settings, DB_PATH)
+        # The engine outlives Stop Bot: "This stream" starts over on every start
+        engine.leaderboards.new_session()
+        
+        if runtime_settings['overlay_mode'] == "process":
+            self.overlay_process = OverlayProcess(runtime_settings)
+            self.overlay_process.start()
+            self.overlay_timer.start(int(SUPERVISE_INTERVAL * 1000))
+            self.log("🍞 Overlay server process started on ws://localhost:8765")
+        
         self.bot_thread = BotThread(token, channel)
         self.bot_thread.log_signal.connect(self.log)
         self.bot_thread.error_signal.connect(self.show_error)
@@ -462,12 +386,50 @@ class BakeRankGUI(QMainWindow):
     def stop_bot(self):
         if self.bot_thread:
             self.log("🛑 Stopping bot...")
+            if self.bot_thread.bot:
+                counters = self.bot_thread.bot.admission.counters
+                self.log(f"📊 Bakes admitted: {counters['admitted']}, "
+                         f"delayed: {counters['delayed']}, dropped: {counters['dropped']}")
             self.bot_thread.stop()
             self.bot_thread.wait()
             self.bot_thread = None
+            # Save any bakes still waiting for a group commit / periodic write
+            engine.persistence.close()
+        
+        if self.overlay_process:
+            self.overlay_timer.stop()
+            self.overlay_process.stop()
+            self.overlay_process = None
+            self.log("🛑 Overlay server process stopped")
         
         self.log("✅ Bot stopped")
         
+    def check_overlay_process(self):
+        """Restart the overlay server process if it died"""
+        if self.overlay_process and self.overlay_process.ensure_running():
+            self.log(f"⚠️ Overlay process stopped - restarted it (restart #{self.overlay_process.restarts})")
+        
+    def send_to_overlays(self, message):
+        """Broadcast from the GUI thread via the bot's event loop when it is running"""
+        if self.bot_thread and self.bot_thread.loop and self.bot_thread.isRunning():
+            asyncio.run_coroutine_threadsafe(broadcast_to_overlays(message), self.bot_thread.loop)
+        else:
+            asyncio.run(broadcast_to_overlays(message))
+        
+    def reload_game_settings(self):
+        """Re-read game settings from bakerank_config.json and apply them live"""
+        try:
+            config = load_game_config(CONFIG_FILE)
+        except (OSError, ValueError) as e:
+            self.log(f"❌ Invalid game settings: {e}")
+            QMessageBox.critical(self, "Error", f"Invalid game settings:\n{e}")
+            return
+        if self.bot_thread and self.bot_thread.isRunning():
+            self.bot_thread.apply_config(config)
+        else:
+            engine.config = config
+            self.log(f"🔄 Game settings loaded ({len(config.normal_items)} items, cooldown {config.cooldown}s)")
+        
     def test_explosion(self):
         """Send test explosion to overlay (doesn't count toward scores)"""
         bake_item, is_legendary = choose_baked_good()
@@ -484,7 +446,7 @@ class BakeRankGUI(QMainWindow):
             "ranked_up": False
         }
         
-        asyncio.run(broadcast_to_overlays(message))
+        self.send_to_overlays(message)
         self.log(f"💥 TEST EXPLOSION: {item_display_name}")
     
     def test_legendary(self):
@@ -511,7 +473,7 @@ class BakeRankGUI(QMainWindow):
             "ranked_up": False
         }
         
-        asyncio.run(broadcast_to_overlays(message))
+        self.send_to_overlays(message)
         self.log(f"✨ TEST LEGENDARY: {item_display_name} ✨")
         
     def log(self, message):
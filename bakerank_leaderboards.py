@@ -0,0 +1,184 @@
+import heapq
+import json
+import os
+import time
+
+from bakerank_stats import bake_day
+
+# ============ TIME-WINDOWED LEADERBOARDS ============
+# Session, daily and weekly boards are kept incrementally: each window
+# holds score buckets only for players who baked in it plus a small
+# top-K index, and everything is dropped in O(1) when the window rolls.
+
+LEADERBOARD_PATH = "bakerank_leaderboards.json"
+TOP_K = 10  # players kept in each top-K index (chat shows the top 5)
+
+WINDOW_ALIASES = {
+    'all': 'all', 'alltime': 'all', 'total': 'all',
+    'session': 'session', 'stream': 'session',
+    'day': 'day', 'daily': 'day', 'today': 'day',
+    'week': 'week', 'weekly': 'week'
+}
+
+WINDOW_LABELS = {
+    'all': "All-time",
+    'session': "This stream",
+    'day': "Today",
+    'week': "This week"
+}
+
+
+def week_id(timestamp):
+    """Monday-based week number (day ordinal 1 was a Monday)"""
+    return (bake_day(timestamp) - 1) // 7
+
+
+def parse_window(name):
+    """Map a chat argument like 'week' or 'today' to a window name (or None)"""
+    return WINDOW_ALIASES.get((name or 'all').lower())
+
+
+class WindowBoard:
+    """Scores for one time window plus an exact top-K index.
+
+    Scores only grow inside a window, so a player outside the top-K can
+    only enter it by passing its lowest score - checked on every bump.
+    """
+
+    def __init__(self, window_of=None, k=TOP_K):
+        self.window_of = window_of  # timestamp -> window id (None never rolls)
+        self.k = k
+        self.window = None
+        self.scores = {}
+        self.top = []  # [(score, username)] sorted high to low
+        self.late = 0  # bakes from an already closed window (replays), not scored
+
+    def roll(self, now):
+        """Start a fresh window if `now` falls past the current one.
+
+        Returns False when `now` belongs to an earlier window: windows only
+        ever roll forward.
+        """
+        if self.window_of is None:
+            return True
+        window = self.window_of(now)
+        if self.window is None or window > self.window:
+            self.window = window
+            self.scores = {}
+            self.top = []
+        return window == self.window
+
+    def set_score(self, username, score):
+        """Set a player's score (scores may only go up within a window)"""
+        self.scores[username] = score
+        self.update_top(username, score)
+
+    def update_top(self, username, score):
+        """Feed a new score into the top-K index only"""
+        top = self.top
+        # Scores only grow, so a player already listed always beats the lowest entry
+        if len(top) >= self.k and score <= top[-1][0]:
+            return
+        for i, (_, name) in enumerate(top):
+            if name == username:
+                top[i] = (score, username)
+                break
+        else:
+            top.append((score, username))
+        top.sort(key=lambda entry: -entry[0])
+        del top[self.k:]
+
+    def add(self, username, now, points=1):
+        if not self.roll(now):
+            self.late += 1
+            return
+        self.set_score(username, self.scores.get(username, 0) + points)
+
+    def leaders(self, now, limit):
+        self.roll(now)
+        return [(username, score) for score, username in self.top[:limit]]
+
+    def rebuild_top(self, scores=None):
+        """One-off O(n) rebuild of the top-K index (startup only)"""
+        if scores is None:
+            scores = self.scores
+        best = heapq.nlargest(self.k, scores.items(), key=lambda x: x[1])
+        self.top = [(score, username) for username, score in best]
+
+
+class Leaderboards:
+    """All-time, session, daily and weekly boards updated on every bake"""
+
+    def __init__(self, player_data=None):
+        self.boards = {
+            'all': WindowBoard(),
+            'session': WindowBoard(),
+            'day': WindowBoard(bake_day),
+            'week': WindowBoard(week_id)
+        }
+        # All-time scores already live in player_data: only index the top-K
+        if player_data:
+            self.boards['all'].rebuild_top({name: data['bake_score'] for name, data in player_data.items()})
+
+    def record(self, username, total_score, now=None):
+        """Count one bake for `username`, whose all-time score is now `total_score`"""
+        if now is None:
+            now = time.time()
+        self.boards['all'].update_top(username, total_score)
+        self.boards['session'].add(username, now)
+        self.boards['day'].add(username, now)
+        self.boards['week'].add(username, now)
+
+    def new_session(self):
+        """Empty the session ("This stream") board for a new stream"""
+        self.boards['session'] = WindowBoard()
+
+    def top(self, window='all', limit=5, now=None):
+        """[(username, score)] for the window, best first"""
+        if now is None:
+            now = time.time()
+        return self.boards[window].leaders(now, limit)
+
+    # ------------- PERSISTENCE -----------------
+    # Daily and weekly windows survive restarts; the session board does not.
+    def to_json(self):
+        """Copy of the saved windows (safe to serialize while bakes continue)"""
+        return {name: {'window': self.boards[name].window, 'scores': dict(self.boards[name].scores)}
+                for name in ('day', 'week')}
+
+    def restore(self, data, now=None):
+        if now is None:
+            now = time.time()
+        for name in ('day', 'week'):
+            board = self.boards[name]
+            saved = data.get(name)
+            if saved and saved.get('window') == board.window_of(now):
+                board.window = saved['window']
+                board.scores = dict(saved.get('scores', {}))
+                board.rebuild_top()
+
+
+def load_leaderboards(player_data, path=LEADERBOARD_PATH):
+    """Build leaderboards from player data plus any saved daily/weekly windows"""
+    boards = Leaderboards(player_data)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                boards.restore(json.load(f))
+        except Exception as e:
+            print(f"⚠️ Warning: Could not load leaderboards: {e}")
+    return boards
+
+
+def dumps_leaderboards(data):
+    """Leaderboard file contents from Leaderboards.to_json() output.
+
+    Built entry by entry instead of one json.dumps() call, so the worker
+    thread writing a huge board keeps handing the GIL back to the bot.
+    """
+    boards = []
+    for name, board in data.items():
+        scores = ",".join([json.dumps(username) + ":" + str(score) for username, score in board['scores'].items()])
+        boards.append(f'"{name}":{{"window":{json.dumps(board["window"])},"scores":{{{scores}}}}}')
+    return "{" + ",".join(boards) + "}"
+
@@ -0,0 +1,219 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+
+import websockets
+
+from bakerank_config import CONFIG_FILE
+from bakerank_runtime import load_runtime_settings, overlay_server_options, run
+
+# ============ OVERLAY SERVER ============
+# The websocket server OBS overlays connect to. It either runs inside the
+# bot's event loop ("inline") or in its own process ("process"), where the
+# bot publishes events to it over a local socket and never waits on slow
+# or numerous overlays. The process is started as its own script (or as
+# the GUI EXE with OVERLAY_PROCESS_FLAG), so it never re-runs the bot's
+# or the GUI's startup code.
+
+OVERLAY_HOST = "0.0.0.0"
+OVERLAY_PORT = 8765
+IPC_HOST = "127.0.0.1"
+PUBLISH_QUEUE_SIZE = 1000      # events buffered while the overlay process is busy/restarting
+SUPERVISE_INTERVAL = 2.0       # seconds between overlay process health checks
+OVERLAY_PROCESS_FLAG = "--overlay-process"  # frozen GUI EXE: run as the overlay process
+
+overlay_clients = set()
+overlay_publisher = None
+
+
+async def handle_overlay_connection(websocket):
+    """Handle incoming overlay connections"""
+    overlay_clients.add(websocket)
+    # Silently handle overlay connections
+    try:
+        async for _ in websocket:
+            pass
+    finally:
+        overlay_clients.remove(websocket)
+
+
+async def send_to_overlays(data):
+    """Send an already-encoded JSON frame to all connected overlays"""
+    if overlay_clients:
+        await asyncio.gather(*[client.send(data) for client in overlay_clients], return_exceptions=True)
+
+
+async def broadcast_to_overlays(message):
+    """Send message to all connected overlays (or hand it to the overlay process)"""
+    if overlay_publisher is not None:
+        overlay_publisher.publish(message)
+    elif overlay_clients:
+        await send_to_overlays(json.dumps(message))
+
+
+async def serve_overlays(settings, on_ready=None):
+    """Run the overlay WebSocket server forever"""
+    async with websockets.serve(handle_overlay_connection, OVERLAY_HOST, OVERLAY_PORT,
+                                **overlay_server_options(settings)):
+        if on_ready:
+            on_ready()
+        await asyncio.Future()  # Run forever
+
+
+# ============ BOT -> OVERLAY PROCESS CHANNEL ============
+# Newline-delimited JSON over a loopback TCP socket: works the same on
+# Windows and Linux, and the overlay process forwards each line as-is.
+
+class OverlayPublisher:
+    """Bot side of the channel: publish() never blocks chat handling"""
+
+    def __init__(self, port, host=IPC_HOST, maxsize=PUBLISH_QUEUE_SIZE):
+        self.host = host
+        self.port = port
+        self.queue = asyncio.Queue(maxsize)
+        self.dropped = 0
+
+    def publish(self, message):
+        try:
+            self.queue.put_nowait((json.dumps(message) + "\n").encode('utf-8'))
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def run(self):
+        """Keep a connection to the overlay process and stream queued events"""
+        pending = None
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError:
+                await asyncio.sleep(1)
+                continue
+            # The overlay process never writes back, so this only finishes when it goes away
+            closed = asyncio.ensure_future(reader.read())
+            try:
+                while True:
+                    if pending is None:
+                        pending = await self.queue.get()
+                    if closed.done():
+                        break  # Reconnect and send the pending event to the new process
+                    writer.write(pending)
+                    pending = None
+                    # Coalesce whatever piled up meanwhile into one flush
+                    while not self.queue.empty():
+                        writer.write(self.queue.get_nowait())
+                    await writer.drain()
+            except (ConnectionError, OSError):
+                pass  # Overlay process went away: reconnect
+            finally:
+                if closed.done() and not closed.cancelled():
+                    closed.exception()
+                closed.cancel()
+                writer.close()
+
+
+def use_overlay_publisher(publisher):
+    """Route broadcast_to_overlays() through the overlay process"""
+    global overlay_publisher
+    overlay_publisher = publisher
+
+
+async def handle_publisher(reader, writer):
+    """Overlay process side: fan each received event out to the overlays"""
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            await send_to_overlays(line.decode('utf-8').rstrip("\n"))
+    except (ConnectionError, OSError):
+        pass
+    finally:
+        writer.close()
+
+
+def run_overlay_process(settings):
+    """Entry point of the separate overlay server process"""
+    async def main():
+        ipc_server = await asyncio.start_server(handle_publisher, IPC_HOST, settings['overlay_ipc_port'])
+        async with ipc_server:
+            await serve_overlays(settings)
+
+    try:
+        run(main, settings['event_loop'])
+    except KeyboardInterrupt:
+        pass
+
+
+def exit_with_parent():
+    """Stop the overlay process once the bot closes its stdin (it exited or crashed)"""
+    if sys.stdin is None:
+        return
+
+    def wait_for_parent():
+        try:
+            sys.stdin.read()
+        finally:
+            os._exit(0)
+
+    threading.Thread(target=wait_for_parent, name="BakeRankParentWatch", daemon=True).start()
+
+
+def overlay_process_main(argv):
+    """`py bakerank_overlay.py [settings JSON]` / `BakeRankBot.exe --overlay-process [settings JSON]`"""
+    settings = json.loads(argv[0]) if argv else load_runtime_settings(CONFIG_FILE)
+    exit_with_parent()
+    run_overlay_process(settings)
+    return 0
+
+
+def overlay_process_command(settings):
+    """Command line that starts the overlay server process"""
+    if getattr(sys, 'frozen', False):
+        # PyInstaller EXE: no separate script to run, so the EXE runs itself
+        return [sys.executable, OVERLAY_PROCESS_FLAG, json.dumps(settings)]
+    return [sys.executable, os.path.abspath(__file__), json.dumps(settings)]
+
+
+class OverlayProcess:
+    """Starts the overlay server process and restarts it if it dies"""
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.process = None
+        self.restarts = 0
+
+    def start(self):
+        # The pipe stays open until stop() or the bot exits; the child quits when it closes
+        self.process = subprocess.Popen(overlay_process_command(self.settings), stdin=subprocess.PIPE)
+
+    def ensure_running(self):
+        """Restart the process if it exited; returns True when it did"""
+        if self.process is not None and self.process.poll() is not None:
+            self.restarts += 1
+            self.start()
+            return True
+        return False
+
+    def stop(self):
+        if self.process is not None:
+            self.process.stdin.close()
+            self.process.terminate()
+            try:
+                self.process.wait(2)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+            self.process = None
+
+    async def supervise(self, log=print, interval=SUPERVISE_INTERVAL):
+        while True:
+            await asyncio.sleep(interval)
+            if self.ensure_running():
+                log(f"⚠️ Overlay process stopped - restarted it (restart #{self.restarts})")
+
+
+if __name__ == "__main__":
+    sys.exit(overlay_process_main(sys.argv[1:]))
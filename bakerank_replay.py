@@ -0,0 +1,168 @@
+import argparse
+import json
+import os
+import random
+import re
+import socket
+import sys
+import time
+from datetime import datetime
+
+import bakerank_db
+from bakerank_config import CONFIG_FILE, load_game_config_or_defaults
+from bakerank_engine import DB_PATH, load_engine
+from bakerank_leaderboards import LEADERBOARD_PATH
+from bakerank_stats import STATS_PATH
+
+# ============ CHAT LOG REPLAY ============
+# Feeds the !bake commands of saved chat logs through the game engine in
+# one batch - e.g. to catch up on a stream the bot missed. Cooldowns apply
+# as if the bakes happened live (bakes older than a player's last one are
+# backfilled); raid shedding does not. Items are rolled fresh, since logs
+# only record who baked, and replaying the same log twice counts it twice.
+# Stop the bot first: the data files are rewritten at the end.
+#
+#   py bakerank_replay.py channel-2024-05-01.log [more logs] [--dry-run]
+#
+# Understood line formats:
+#   [2024-05-01 19:04:12] username: !bake
+#   [19:04:12] username: !bake              (Chatterino; date from --date or the file name)
+#   {"user": "username", "time": 1714590252, "message": "!bake"}   (JSON lines)
+
+BAKE_COMMAND = "!bake"
+BOT_LOCK_PORT = 47200  # single instance port held by the running terminal bot
+
+LINE_PATTERN = re.compile(r"^\[(?:(\d{4})-(\d{2})-(\d{2})[ T])?(\d{1,2}):(\d{2}):(\d{2})\]\s+([^\s:]+):\s?(.*)$")
+DATE_PATTERN = re.compile(r"(\d{4}-\d{2}-\d{2})")
+
+
+def is_bake(message):
+    words = message.split(None, 1)
+    return bool(words) and words[0] == BAKE_COMMAND
+
+
+def parse_json_line(line):
+    """(username, timestamp) for a JSON lines bake, else None"""
+    event = json.loads(line)
+    username = event.get('user') or event.get('username')
+    timestamp = event.get('time', event.get('timestamp'))
+    if not username or timestamp is None:
+        return None
+    if 'message' in event and not is_bake(event['message']):
+        return None
+    return username, float(timestamp)
+
+
+def iter_log_bakes(lines, default_date=None):
+    """Yield (username, timestamp) for every !bake line of a chat log"""
+    default_day = tuple(int(part) for part in default_date.split('-')) if default_date else None
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('{'):
+            try:
+                event = parse_json_line(line)
+            except (ValueError, AttributeError):
+                continue
+            if event:
+                yield event
+            continue
+        match = LINE_PATTERN.match(line)
+        if not match or not is_bake(match.group(8)):
+            continue
+        year, month, day, hour, minute, second, username, _ = match.groups()
+        if year:
+            date = (int(year), int(month), int(day))
+        elif default_day:
+            date = default_day
+        else:
+            continue
+        yield username, datetime(*date, int(hour), int(minute), int(second)).timestamp()
+
+
+def log_date(path, override=None):
+    """Date for time-only log lines: --date, else a YYYY-MM-DD in the file name"""
+    if override:
+        return override
+    match = DATE_PATTERN.search(os.path.basename(path))
+    return match.group(1) if match else None
+
+
+def read_bake_events(paths, date=None):
+    """All !bake events of the given logs, oldest first"""
+    events = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            events.extend(iter_log_bakes(f, log_date(path, date)))
+    events.sort(key=lambda event: event[1])
+    return events
+
+
+def bot_is_running():
+    """True when the terminal bot holds its single instance port"""
+    probe = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        probe.bind(('127.0.0.1', BOT_LOCK_PORT))
+        return False
+    except OSError:
+        return True
+    finally:
+        probe.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay !bake commands from chat logs into BakeRank")
+    parser.add_argument("logs", nargs="+", help="chat log files")
+    parser.add_argument("--date", help="date (YYYY-MM-DD) for logs whose lines only have a time")
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without saving")
+    parser.add_argument("--seed", type=int, help="random seed for item rolls (repeatable dry runs)")
+    parser.add_argument("--db", default=DB_PATH, help="player database (bakerank_data.txt)")
+    parser.add_argument("--stats", default=STATS_PATH, help="bake statistics (bakerank_stats.json)")
+    parser.add_argument("--leaderboards", default=LEADERBOARD_PATH, help="leaderboard windows")
+    parser.add_argument("--config", default=CONFIG_FILE, help="game settings (bakerank_config.json)")
+    args = parser.parse_args()
+
+    if not args.dry_run and bot_is_running():
+        print("❌ ERROR: Bot is running! Stop it first - it would overwrite the replayed bakes.")
+        return 1
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    config = load_game_config_or_defaults(args.config)
+
+    start = time.perf_counter()
+    try:
+        events = read_bake_events(args.logs, args.date)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not read chat log: {e}")
+        return 1
+    engine = load_engine(config, args.db, args.stats, args.leaderboards)
+    loaded = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = engine.bake_many(events)
+    replayed = time.perf_counter() - start
+
+    baked = [result for result in results if result.baked]
+    print("=" * 50)
+    print(f"🍞 Replayed {len(events)} !bake commands from {len(args.logs)} log(s)")
+    print("=" * 50)
+    print(f"  Baked:            {len(baked)}")
+    print(f"  Oven cooling:     {len(results) - len(baked)}")
+    print(f"  Bakers:           {len({result.username for result in baked})}")
+    print(f"  Rank-ups:         {sum(result.ranked_up for result in baked)}")
+    print(f"  Legendaries:      {sum(result.is_legendary for result in baked)}")
+    print(f"\n⚡ Loaded in {loaded:.2f}s, replayed in {replayed:.2f}s")
+
+    if args.dry_run:
+        print("ℹ️ Dry run - nothing saved.")
+        return 0
+    if baked:
+        bakerank_db.render_snapshot(engine.snapshot(args.db, args.stats, args.leaderboards), durable=True)
+        print(f"💾 Saved {args.db}, {args.stats} and {args.leaderboards}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
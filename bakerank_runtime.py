@@ -0,0 +1,115 @@
+import asyncio
+import json
+import os
+
+# ============ RUNTIME OPTIONS ============
+# Event loop backend and overlay websocket server tuning, read from
+# bakerank_config.json when the bot starts (changing them needs a bot
+# restart; the GUI re-reads them on every Start Bot).
+
+RUNTIME_DEFAULTS = {
+    'event_loop': "auto",          # "auto", "asyncio", "uvloop" or "winloop"
+    'overlay_compression': False,  # per-message deflate costs more than it saves on tiny JSON frames
+    'overlay_max_size': 4096,      # overlays never send more than a ping; bound incoming frames
+    'overlay_max_queue': 4,        # incoming frames buffered per overlay
+    'overlay_write_limit': 65536,  # outgoing bytes buffered per overlay before send() waits
+    'overlay_ping_interval': 20,   # seconds between keepalive pings (null = off)
+    'overlay_ping_timeout': 20,    # seconds to wait for a pong before dropping the overlay
+    'overlay_mode': "inline",      # "inline" (in the bot's loop) or "process" (separate process)
+    'overlay_ipc_port': 8766,      # local port the bot publishes events on in "process" mode
+    'durability': "group_commit",  # "every_bake", "group_commit" or "best_effort"
+    'group_commit_ms': 200,        # group_commit: longest a bake waits to be written
+    'group_commit_bakes': 50,      # group_commit: write as soon as this many bakes are waiting
+    'best_effort_interval': 5      # best_effort: seconds between writes (no directory fsync)
+}
+
+# Optional faster loops, tried in order for event_loop = "auto"
+FAST_LOOPS = ["uvloop", "winloop"]
+
+
+def load_runtime_settings(path):
+    """Runtime options from the config file, defaults for anything missing"""
+    settings = dict(RUNTIME_DEFAULTS)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                saved = json.load(f)
+            settings.update({k: v for k, v in saved.items() if k in RUNTIME_DEFAULTS})
+        except Exception as e:
+            print(f"⚠️ Warning: Could not load runtime settings: {e}")
+    return settings
+
+
+def _import_loop(name):
+    try:
+        return __import__(name)
+    except ImportError:
+        return None
+
+
+def new_event_loop(choice="auto"):
+    """Return (loop, backend_name), falling back to asyncio when the
+    requested backend is not installed"""
+    if choice != "auto" and choice != "asyncio" and choice not in FAST_LOOPS:
+        print(f"⚠️ Unknown event loop '{choice}' (use auto, asyncio, {', '.join(FAST_LOOPS)}), using asyncio")
+        choice = "asyncio"
+    candidates = FAST_LOOPS if choice == "auto" else [choice]
+    for name in candidates:
+        if name == "asyncio":
+            break
+        module = _import_loop(name)
+        if module is not None:
+            return module.new_event_loop(), name
+        if choice != "auto":
+            print(f"⚠️ Event loop '{name}' is not installed, using asyncio")
+    return asyncio.new_event_loop(), "asyncio"
+
+
+def cancel_all_tasks(loop):
+    """Cancel every task still pending on `loop` and let them finish (as asyncio.run does)"""
+    tasks = asyncio.all_tasks(loop)
+    if not tasks:
+        return
+    for task in tasks:
+        task.cancel()
+    loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+    for task in tasks:
+        if task.cancelled():
+            continue
+        if task.exception() is not None:
+            loop.call_exception_handler({
+                'message': "unhandled exception during shutdown",
+                'exception': task.exception(),
+                'task': task
+            })
+
+
+def run(main, choice="auto"):
+    """Like asyncio.run(main()), on the chosen event loop backend"""
+    loop, backend = new_event_loop(choice)
+    print(f"⚙️ Event loop: {backend}")
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(main())
+    finally:
+        try:
+            # Ctrl+C leaves the bot, overlay and watcher tasks pending: cancel
+            # them so twitchio and the websockets close their connections
+            cancel_all_tasks(loop)
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(loop.shutdown_default_executor())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+
+def overlay_server_options(settings):
+    """Keyword arguments for websockets.serve() from runtime settings"""
+    return {
+        'compression': "deflate" if settings['overlay_compression'] else None,
+        'max_size': settings['overlay_max_size'],
+        'max_queue': settings['overlay_max_queue'],
+        'write_limit': settings['overlay_write_limit'],
+        'ping_interval': settings['overlay_ping_interval'],
+        'ping_timeout': settings['overlay_ping_timeout']
+    }
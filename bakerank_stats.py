@@ -0,0 +1,164 @@
+import json
+import os
+from array import array
+from datetime import date
+
+# ============ BAKE STATISTICS ============
+# Per-user and channel-wide counters kept up to date on every bake, so
+# !mystats and !legendaries answer without scanning every player.
+# Item counts are arrays indexed by a stable asset ID, not nested dicts.
+
+STATS_PATH = "bakerank_stats.json"
+
+
+def bake_day(timestamp):
+    """Local calendar day number of a timestamp (for daily streaks)"""
+    return date.fromtimestamp(timestamp).toordinal()
+
+
+class PlayerStats:
+    __slots__ = ('counts', 'bakes', 'legendary_hits', 'favorite',
+                 'first_bake_time', 'streak', 'best_streak', 'last_bake_day')
+
+    def __init__(self):
+        self.counts = array('I')
+        self.bakes = 0
+        self.legendary_hits = 0
+        self.favorite = -1
+        self.first_bake_time = 0.0
+        self.streak = 0
+        self.best_streak = 0
+        self.last_bake_day = 0
+
+
+class BakeStats:
+    """Bake counters for one channel, plus the aggregates chat commands need"""
+
+    def __init__(self):
+        self.items = []        # asset ID -> item filename
+        self.item_ids = {}     # item filename -> asset ID
+        self.players = {}
+        self.channel_counts = array('Q')
+        self.total_bakes = 0
+        self.total_legendaries = 0
+        self.top_legendary_user = None
+
+    def item_id(self, item):
+        """Stable asset ID for an item filename (assigned on first sight)"""
+        asset_id = self.item_ids.get(item)
+        if asset_id is None:
+            asset_id = len(self.items)
+            self.items.append(item)
+            self.item_ids[item] = asset_id
+            self.channel_counts.append(0)
+        return asset_id
+
+    def record(self, username, item, is_legendary, now):
+        """Count one bake; O(1) apart from growing a count array"""
+        asset_id = self.item_id(item)
+        stats = self.players.get(username)
+        if stats is None:
+            stats = self.players[username] = PlayerStats()
+        if stats.bakes == 0 or now < stats.first_bake_time:
+            stats.first_bake_time = now
+
+        counts = stats.counts
+        if len(counts) <= asset_id:
+            counts.extend([0] * (asset_id + 1 - len(counts)))
+        counts[asset_id] += 1
+        if stats.favorite < 0 or counts[asset_id] > counts[stats.favorite]:
+            stats.favorite = asset_id
+        stats.bakes += 1
+
+        # Backfilled (older) bakes never rewind the streak
+        day = bake_day(now)
+        if day > stats.last_bake_day:
+            stats.streak = stats.streak + 1 if day == stats.last_bake_day + 1 else 1
+            stats.best_streak = max(stats.best_streak, stats.streak)
+            stats.last_bake_day = day
+
+        self.channel_counts[asset_id] += 1
+        self.total_bakes += 1
+        if is_legendary:
+            stats.legendary_hits += 1
+            self.total_legendaries += 1
+            self._update_top_legendary(username, stats)
+
+    def _update_top_legendary(self, username, stats):
+        top = self.players.get(self.top_legendary_user)
+        if top is None or stats.legendary_hits > top.legendary_hits:
+            self.top_legendary_user = username
+
+    def get(self, username):
+        return self.players.get(username)
+
+    def current_streak(self, stats, now):
+        """Daily streak, or 0 if the player skipped a day since their last bake"""
+        return stats.streak if bake_day(now) - stats.last_bake_day <= 1 else 0
+
+    def favorite_item(self, stats):
+        """(item filename, count) of a player's most baked item, or (None, 0)"""
+        if stats.favorite < 0:
+            return None, 0
+        return self.items[stats.favorite], stats.counts[stats.favorite]
+
+    def top_legendary(self):
+        """(username, legendary_hits) of the channel's luckiest baker"""
+        if self.top_legendary_user is None:
+            return None, 0
+        return self.top_legendary_user, self.players[self.top_legendary_user].legendary_hits
+
+    # ------------- PERSISTENCE -----------------
+    # Saved as {"items": [...], "players": {username: row}}; each player's
+    # row is serialized on its own so unchanged players can be reused.
+    def player_json(self, username):
+        """One player's '"username":[row]' entry of the saved file"""
+        s = self.players[username]
+        row = [s.first_bake_time, s.legendary_hits, s.streak,
+               s.best_streak, s.last_bake_day, s.counts.tolist()]
+        return json.dumps(username) + ":" + json.dumps(row, separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, data):
+        """Rebuild stats and every aggregate from a saved snapshot"""
+        stats = cls()
+        for item in data.get('items', []):
+            stats.item_id(item)
+        for username, row in data.get('players', {}).items():
+            first_bake_time, legendary_hits, streak, best_streak, last_bake_day, counts = row
+            s = PlayerStats()
+            s.counts = array('I', counts)
+            s.bakes = sum(counts)
+            s.legendary_hits = legendary_hits
+            s.first_bake_time = first_bake_time
+            s.streak = streak
+            s.best_streak = best_streak
+            s.last_bake_day = last_bake_day
+            if counts:
+                s.favorite = max(range(len(counts)), key=counts.__getitem__)
+            stats.players[username] = s
+            for asset_id, n in enumerate(counts):
+                stats.channel_counts[asset_id] += n
+            stats.total_bakes += s.bakes
+            stats.total_legendaries += legendary_hits
+            if legendary_hits:
+                stats._update_top_legendary(username, s)
+        return stats
+
+
+def load_bake_stats(path=STATS_PATH):
+    """Load bake statistics (empty stats if the file is missing or broken)"""
+    if not os.path.exists(path):
+        return BakeStats()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return BakeStats.from_json(json.load(f))
+    except Exception as e:
+        print(f"⚠️ Warning: Could not load bake stats: {e}")
+        return BakeStats()
+
+
+def dumps_bake_stats(items, player_entries):
+    """Stats file contents from the item list and player_json() entries"""
+    return '{"items":' + json.dumps(items, separators=(',', ':')) + ',"players":{' + ",".join(player_entries) + '}}'
+
@@ -0,0 +1,101 @@
+from bakerank_admission import ADMIT, DELAY, DROP, AdmissionController, CooldownWheel, TokenBucket
+
+# ============ ADMISSION CONTROL TESTS ============
+# Cooldown wheel slots and laps, token bucket refill and lag shedding.
+#   py -m pytest test_bakerank_admission.py
+
+NOW = 1_700_000_000.0  # fixed clock, so every test sees the same wheel slots
+
+
+def test_cooldown_spam_is_delayed_once_then_dropped():
+    admission = AdmissionController(60)
+    assert admission.admit("vokerr", NOW) == (ADMIT, 0)
+    assert admission.admit("vokerr", NOW + 10) == (DELAY, 50)
+    assert admission.admit("vokerr", NOW + 20)[0] == DROP
+    assert admission.admit("vokerr", NOW + 30)[0] == DROP
+    assert admission.counters == {'admitted': 1, 'delayed': 1, 'dropped': 2}
+
+
+def test_cooldown_expires_after_the_cooldown():
+    admission = AdmissionController(60)
+    admission.admit("vokerr", NOW)
+    admission.admit("vokerr", NOW + 59)
+    assert admission.admit("vokerr", NOW + 60) == (ADMIT, 0)
+    # A fresh cooldown: the user is told once again
+    assert admission.admit("vokerr", NOW + 61)[0] == DELAY
+
+
+def test_idle_users_expire_from_the_wheel():
+    wheel = CooldownWheel(60)
+    wheel.advance(NOW)
+    for i in range(1000):
+        wheel.record(f"user{i}", NOW + i * 0.01)
+    assert len(wheel) == 1000
+    wheel.advance(NOW + 30)
+    assert len(wheel) == 1000
+    # Only the slots the clock passed are touched: cooldowns ending before NOW + 62
+    wheel.advance(NOW + 62)
+    assert len(wheel) == 800
+    wheel.advance(NOW + 71)
+    assert len(wheel) == 0
+    assert not any(wheel.slots)
+    assert not wheel.warned
+
+
+def test_entries_from_a_later_lap_stay_in_the_wheel():
+    wheel = CooldownWheel(10)
+    wheel.advance(NOW)
+    # Adopted from the database with a longer cooldown than the wheel spans
+    wheel.expires["vokerr"] = NOW + 25
+    wheel._slot(NOW + 25).add("vokerr")
+    wheel.advance(NOW + 12)
+    assert wheel.remaining("vokerr", NOW + 12) == 13
+    wheel.advance(NOW + 26)
+    assert len(wheel) == 0
+
+
+def test_resize_keeps_running_cooldowns():
+    wheel = CooldownWheel(60)
+    wheel.advance(NOW)
+    wheel.record("vokerr", NOW)
+    wheel.set_cooldown(300)
+    assert wheel.size == 301
+    assert wheel.remaining("vokerr", NOW + 30) == 30
+    # New bakes use the new cooldown
+    wheel.record("other", NOW)
+    assert wheel.remaining("other", NOW + 30) == 270
+    wheel.advance(NOW + 61)
+    assert len(wheel) == 1
+    wheel.set_cooldown(10)
+    assert wheel.size == 11
+    wheel.advance(NOW + 301)
+    assert len(wheel) == 0
+    assert not any(wheel.slots)
+
+
+def test_token_bucket_refills_up_to_its_burst():
+    bucket = TokenBucket(rate=2, burst=3)
+    bucket.updated = NOW
+    assert [bucket.take(NOW) for _ in range(4)] == [True, True, True, False]
+    assert bucket.take(NOW + 0.5)
+    assert not bucket.take(NOW + 0.5)
+    # A long idle spell refills only up to the burst
+    assert [bucket.take(NOW + 100) for _ in range(4)] == [True, True, True, False]
+
+
+def test_sync_cooldown_recounts_the_bake_as_delayed():
+    admission = AdmissionController(60)
+    assert admission.admit("vokerr", NOW)[0] == ADMIT
+    # The database says the user baked 20s ago
+    admission.sync_cooldown("vokerr", NOW - 20)
+    assert admission.counters == {'admitted': 0, 'delayed': 1, 'dropped': 0}
+    assert admission.admit("vokerr", NOW + 5) == (DROP, 35)
+    assert admission.admit("vokerr", NOW + 40)[0] == ADMIT
+
+
+def test_loop_lag_sheds_new_bakes():
+    admission = AdmissionController(60)
+    admission.loop_lag = 1.0
+    assert admission.admit("vokerr", NOW) == (DROP, 0)
+    admission.loop_lag = 0.0
+    assert admission.admit("vokerr", NOW + 1)[0] == ADMIT
@@ -0,0 +1,40 @@
+import asyncio
+import os
+
+from bakerank_db import SnapshotWriter, atomic_write
+
+# ============ DATABASE WRITE TESTS ============
+# Failed snapshot writes must keep their bakes pending for the next try.
+#   py -m pytest test_bakerank_db.py
+
+
+def test_atomic_write_replaces_the_file(tmp_path):
+    path = str(tmp_path / "bakerank_data.txt")
+    atomic_write(path, "old")
+    atomic_write(path, "new", durable=True)
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == "new"
+    assert os.listdir(tmp_path) == ["bakerank_data.txt"]
+
+
+def test_failed_flush_keeps_bakes_pending(tmp_path):
+    path = str(tmp_path / "missing" / "bakerank_data.txt")
+    errors = []
+    writer = SnapshotWriter(lambda: lambda: [(path, "vokerr | 1 | 0\n")], "best_effort", on_error=errors.append)
+
+    async def bake_twice():
+        await writer.commit()
+        await writer.commit()
+        await writer.flush()
+
+    asyncio.run(bake_twice())
+    assert writer.pending == 2
+    assert writer.writes == 0
+    assert len(errors) == 1
+
+    # close() at shutdown still saves them once the folder is back
+    os.mkdir(tmp_path / "missing")
+    writer.close()
+    assert writer.pending == 0
+    assert writer.writes == 1
+    assert os.path.exists(path)
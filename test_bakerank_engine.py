@@ -0,0 +1,62 @@
+import os
+import time
+
+from bakerank_config import build_game_config
+from bakerank_engine import COOLING_DOWN, BakeEngine
+from bakerank_leaderboards import Leaderboards
+
+# ============ ENGINE TESTS ============
+# Out-of-order bakes: replaying a stream the bot missed must not be
+# rejected by later bakes or wipe the current daily / weekly boards.
+# A new stream only resets the session board.
+#   py -m pytest test_bakerank_engine.py
+
+OVERLAY_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "overlay")
+DAY = 86400
+
+
+def make_engine():
+    config = build_game_config({'cooldown': 60, 'legendary_rate': 0, 'overlay_folder': OVERLAY_FOLDER})
+    return BakeEngine(config)
+
+
+def test_cooldown_applies_to_new_bakes():
+    engine = make_engine()
+    now = time.time()
+    assert engine.bake("Vokerr", now).baked
+    result = engine.bake("vokerr", now + 30)
+    assert result.status == COOLING_DOWN
+    assert result.remaining == 30
+    assert engine.bake("vokerr", now + 60).baked
+
+
+def test_replay_backfills_bakes_older_than_the_last_one():
+    engine = make_engine()
+    now = time.time()
+    engine.bake("vokerr", now)
+    missed = [("vokerr", now - DAY), ("vokerr", now - DAY + 30), ("vokerr", now - DAY + 90), ("vokerr", now - 30)]
+    results = engine.bake_many(missed)
+    # 30s after the previous backfill and 30s before the live bake are too close
+    assert [result.baked for result in results] == [True, False, True, False]
+    assert engine.player_data['vokerr'] == {'bake_score': 3, 'last_bake_time': now}
+    assert engine.stats.get('vokerr').first_bake_time == now - DAY
+
+
+def test_older_bakes_do_not_reset_windowed_boards():
+    boards = Leaderboards()
+    now = time.time()
+    boards.record("today_user", 1, now)
+    boards.record("x", 1, now - DAY)
+    assert boards.top('day', 5, now) == [("today_user", 1)]
+    assert boards.top('week', 5, now)[0] == ("today_user", 1)
+    assert boards.boards['day'].late == 1
+
+
+def test_new_session_only_resets_the_session_board():
+    engine = make_engine()
+    now = time.time()
+    engine.bake("vokerr", now)
+    engine.leaderboards.new_session()
+    engine.bake("other", now)
+    assert engine.leaderboards.top('session', 5, now) == [("other", 1)]
+    assert len(engine.leaderboards.top('day', 5, now)) == 2